@@ -0,0 +1,275 @@
+import hmac
+import json
+import logging
+import threading
+import requests
+from functools import partial
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .merkle import MerkleTree
+from .snapshot import asset_record, record_asset
+
+logger = logging.getLogger(__name__)
+
+# Agent mode: each host crawls its own tree and serves the Merkle tree and asset
+# records over HTTP. The auditor walks both trees from the root and only fetches
+# directories whose digests differ, so identical subtrees cost one digest each.
+# File content is fetched only for assets that need a content diff.
+
+AGENT_SCHEME = 'agent://'
+TOKEN_HEADER = 'X-Agent-Token'
+REQUEST_TIMEOUT = 60
+
+class Agent:
+    """Crawl state served by an agent; refresh() re-crawls with a fresh Crawler."""
+
+    def __init__(self, make_crawler, token=None):
+        self.make_crawler = make_crawler
+        self.token = token
+        self.assets = {}
+        self.tree = MerkleTree().finalize()
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        crawler = self.make_crawler()
+        assets = crawler.crawl()
+        tree = crawler.tree
+        if tree is None:
+            # Compact, staged and URL crawls keep no tree; build one from the assets
+            tree = MerkleTree()
+            for asset in assets.values():
+                tree.add(asset)
+            tree.finalize()
+        with self._lock:
+            self.assets, self.tree = assets, tree
+        logger.info(f"Agent serving {len(assets)} assets from {crawler.base_uri}")
+
+    def state(self):
+        with self._lock:
+            return self.assets, self.tree
+
+class AgentHandler(BaseHTTPRequestHandler):
+    # GET /info                 root digest and asset count
+    # GET /dir?path=D           D's digest and entries (child digests, records for files)
+    # GET /subtree?path=D       records of every file below D
+    # GET /asset?path=P         one record
+    # GET /content?path=P       raw bytes
+    # POST /refresh             re-crawl
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        path = parse_qs(url.query).get('path', [''])[0]
+        assets, tree = self.server.agent.state()
+
+        if url.path == '/info':
+            self._send_json({'root': tree.digests.get(''), 'count': len(assets)})
+        elif url.path == '/dir':
+            entries = []
+            for name, is_dir in sorted(tree.children.get(path, {}).items()):
+                child = tree._join(path, name)
+                if is_dir:
+                    entries.append({'name': name, 'dir': True, 'digest': tree.digests.get(child)})
+                else:
+                    entries.append({'name': name, 'dir': False, 'digest': tree.leaves.get(child),
+                                    'asset': asset_record(assets[child])})
+            self._send_json({'digest': tree.digests.get(path), 'entries': entries})
+        elif url.path == '/subtree':
+            records = [asset_record(assets[p]) for p in sorted(tree.files_under(path))]
+            self._send_json({'assets': records, 'leaves': {r['path']: tree.leaves.get(r['path']) for r in records}})
+        elif url.path == '/asset':
+            asset = assets.get(path)
+            if asset:
+                self._send_json(asset_record(asset))
+            else:
+                self._send_error(404)
+        elif url.path == '/content':
+            # Only crawled assets are served, so no path outside the crawl is reachable
+            asset = assets.get(path)
+            content = asset.content if asset else None
+            if content is None:
+                self._send_error(404)
+            else:
+                self._send(200, 'application/octet-stream', content if isinstance(content, bytes) else content.encode('utf-8'))
+        else:
+            self._send_error(404)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if urlparse(self.path).path == '/refresh':
+            self.server.agent.refresh()
+            self._send_json({'count': len(self.server.agent.assets)})
+        else:
+            self._send_error(404)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _authorized(self):
+        token = self.server.agent.token
+        if token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), token):
+            self._send_error(403)
+            return False
+        return True
+
+    def _send_json(self, data):
+        self._send(200, 'application/json', json.dumps(data, separators=(',', ':'), default=str).encode('utf-8'))
+
+    def _send_error(self, status):
+        self._send(status, 'text/plain', b'')
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def make_server(agent, host='127.0.0.1', port=0):
+    """An HTTP server for agent (call agent.refresh() first); port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), AgentHandler)
+    server.agent = agent
+    return server
+
+class AgentClient:
+    def __init__(self, uri, token=None):
+        self.base_url = 'http://' + uri[len(AGENT_SCHEME):].rstrip('/')
+        self.session = requests.Session()
+        if token:
+            self.session.headers[TOKEN_HEADER] = token
+
+    def get_json(self, endpoint, **params):
+        """Decoded JSON, or None on 404."""
+        response = self.session.get(self.base_url + endpoint, params=params, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def content(self, path):
+        response = self.session.get(self.base_url + '/content', params={'path': path}, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
+
+class _LazyView:
+    # Read-only mapping over one of RemoteTree's caches; a miss fetches the
+    # directory that would hold the key.
+    def __init__(self, cache, fetch, directory_of):
+        self._cache = cache
+        self._fetch = fetch
+        self._directory_of = directory_of
+
+    def get(self, key, default=None):
+        if key not in self._cache:
+            self._fetch(self._directory_of(key))
+        return self._cache.get(key, default)
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            self._fetch(self._directory_of(key))
+        return self._cache[key]
+
+class RemoteTree(MerkleTree):
+    """
+    MerkleTree of an agent's crawl, fetched one directory at a time as diff_paths
+    visits it. Digests of subdirectories arrive with their parent's listing, so
+    identical subtrees are never listed. Works on either side of diff_paths.
+    """
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.records = {} # path -> asset record, for every file seen so far
+        self._digests = {}
+        self._children = {}
+        self._leaves = {}
+        self._fetched = set()
+        self.digests = _LazyView(self._digests, self._fetch, lambda d: d)
+        self.children = _LazyView(self._children, self._fetch, lambda d: d)
+        self.leaves = _LazyView(self._leaves, self._fetch, lambda p: p.rpartition('/')[0])
+
+    def add(self, asset):
+        raise TypeError("RemoteTree is read-only")
+
+    def finalize(self):
+        return self
+
+    def files_under(self, directory):
+        # One request for a whole one-sided subtree instead of a listing per directory
+        data = self.client.get_json('/subtree', path=directory) or {'assets': [], 'leaves': {}}
+        for record in data['assets']:
+            self.records[record['path']] = record
+            self._leaves[record['path']] = data['leaves'].get(record['path'])
+            yield record['path']
+
+    def _fetch(self, directory):
+        if directory in self._fetched:
+            return
+        self._fetched.add(directory)
+        data = self.client.get_json('/dir', path=directory)
+        if data is None or data['digest'] is None:
+            return # Not a directory on this host
+        self._digests[directory] = data['digest']
+        children = {}
+        for entry in data['entries']:
+            path = self._join(directory, entry['name'])
+            children[entry['name']] = entry['dir']
+            if entry['dir']:
+                self._digests[path] = entry['digest']
+            else:
+                self._leaves[path] = entry['digest']
+                self.records[path] = entry['asset']
+        self._children[directory] = children
+
+class RemoteAssets:
+    """Assets mapping over an agent. Records come from the tree walk; content is fetched on demand."""
+
+    def __init__(self, client, tree, count):
+        self.client = client
+        self.tree = tree
+        self.count = count
+        self._complete = False
+
+    def get(self, path, default=None):
+        record = self.tree.records.get(path)
+        if record is None and not self._complete:
+            record = self.client.get_json('/asset', path=path)
+            if record:
+                self.tree.records[path] = record
+        return self._asset(record) if record else default
+
+    def __getitem__(self, path):
+        asset = self.get(path)
+        if asset is None:
+            raise KeyError(path)
+        return asset
+
+    def __contains__(self, path):
+        return self.get(path) is not None
+
+    def __len__(self):
+        return self.count
+
+    def keys(self):
+        # Full listing: only needed when the other side has no tree to reconcile against
+        if not self._complete:
+            for _ in self.tree.files_under(''):
+                pass
+            self._complete = True
+        return sorted(self.tree.records)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def values(self):
+        return [self[path] for path in self.keys()]
+
+    def items(self):
+        return [(path, self[path]) for path in self.keys()]
+
+    def _asset(self, record):
+        return record_asset(record, loader=partial(self.client.content, record['path']))
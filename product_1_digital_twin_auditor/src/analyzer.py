@@ -1,42 +1,120 @@
-import json
-try:
-    import yaml
-except ImportError:
-    yaml = None
 import difflib
 from .crawler import Asset
+from .merkle import clean_metadata
+from .manifest import AssetManifest
+from . import structdiff, textdiff
+
+# Similarity pass for renames: only text files up to this size, and only pairs at or above the ratio
+SIMILAR_MAX_SIZE = 256 * 1024
+SIMILAR_MIN_RATIO = 0.9
+# Candidate pairs compared per file name bucket; larger buckets are skipped to stay near-linear
+SIMILAR_MAX_PAIRS = 25
 
 class Analyzer:
-    def __init__(self, source_assets, target_assets):
+    def __init__(self, source_assets, target_assets, source_tree=None, target_tree=None,
+                 detect_renames=True, similar_renames=False):
         self.source_assets = source_assets
         self.target_assets = target_assets
+        # Optional MerkleTrees from the crawlers; identical subtrees are skipped
+        self.source_tree = source_tree
+        self.target_tree = target_tree
+        self.on_issue = None # Optional callback, called with each issue as it is added
+        # Pair MISSING/NEW assets with identical content (or, optionally, near-identical text) into RENAMED
+        self.detect_renames = detect_renames
+        self.similar_renames = similar_renames
+        self._missing = [] # (issue, asset) candidates for rename pairing
+        self._new = []
         self.report = {
-            'summary': {'missing': 0, 'new': 0, 'modified': 0, 'metadata_mismatch': 0, 'errors': 0},
+            'summary': {'missing': 0, 'new': 0, 'modified': 0, 'metadata_mismatch': 0, 'errors': 0, 'renamed': 0, 'cosmetic': 0},
             'details': [],
             'removed_in_prod': [],
             'modified': []
         }
 
     def analyze(self):
-        all_paths = set(self.source_assets.keys()) | set(self.target_assets.keys())
+        if isinstance(self.source_assets, AssetManifest) and isinstance(self.target_assets, AssetManifest):
+            return self._analyze_manifests(self.source_assets, self.target_assets)
+
+        if self.source_tree and self.target_tree:
+            # Only descend into directories whose digests differ
+            all_paths = self.source_tree.diff_paths(self.target_tree)
+        else:
+            all_paths = set(self.source_assets.keys()) | set(self.target_assets.keys())
 
         for path in sorted(all_paths):
-            source = self.source_assets.get(path)
-            target = self.target_assets.get(path)
-
-            if source and not target:
-                self._add_issue('MISSING', path, 'Asset exists in source but missing in target', 'High')
-                self.report['summary']['missing'] += 1
-                self.report['removed_in_prod'].append(path)
-            elif target and not source:
-                self._add_issue('NEW', path, 'New asset found in target', 'Low')
-                self.report['summary']['new'] += 1
+            self._compare_path(path, self.source_assets.get(path), self.target_assets.get(path))
+
+        self._pair_renames()
+        return self.report
+
+    def analyze_stream(self, source_iter, target_iter, on_issue=None):
+        """
+        Merge join over two asset streams that are both sorted by path.
+        Issues are reported through on_issue as soon as they are found; neither
+        side is held in memory.
+        """
+        self.on_issue = on_issue
+        done = object()
+        source = next(source_iter, done)
+        target = next(target_iter, done)
+
+        while source is not done or target is not done:
+            if target is done or (source is not done and source.path < target.path):
+                self._compare_path(source.path, source, None)
+                source = next(source_iter, done)
+            elif source is done or target.path < source.path:
+                self._compare_path(target.path, None, target)
+                target = next(target_iter, done)
+            else:
+                self._compare_path(source.path, source, target)
+                source = next(source_iter, done)
+                target = next(target_iter, done)
+
+        self._pair_renames()
+        return self.report
+
+    def _analyze_manifests(self, source, target):
+        # Merge join over the manifest rows in path order. Matching rows are
+        # compared column to column; Asset objects are only built for rows with issues.
+        source_rows = iter(source.sorted_rows())
+        target_rows = iter(target.sorted_rows())
+        s_row = next(source_rows, None)
+        t_row = next(target_rows, None)
+
+        while s_row is not None or t_row is not None:
+            s_path = source.path(s_row) if s_row is not None else None
+            t_path = target.path(t_row) if t_row is not None else None
+            if t_path is None or (s_path is not None and s_path < t_path):
+                self._compare_path(s_path, source.asset(s_row), None)
+                s_row = next(source_rows, None)
+            elif s_path is None or t_path < s_path:
+                self._compare_path(t_path, None, target.asset(t_row))
+                t_row = next(target_rows, None)
             else:
-                # Both exist
-                self._compare_assets(source, target)
+                if not source.same_row(s_row, target, t_row):
+                    self._compare_path(s_path, source.asset(s_row), target.asset(t_row))
+                s_row = next(source_rows, None)
+                t_row = next(target_rows, None)
 
+        self._pair_renames()
         return self.report
 
+    def _compare_path(self, path, source, target):
+        if source and not target:
+            issue = self._add_issue('MISSING', path, 'Asset exists in source but missing in target', 'High')
+            self.report['summary']['missing'] += 1
+            self.report['removed_in_prod'].append(path)
+            if self.detect_renames:
+                self._missing.append((issue, source))
+        elif target and not source:
+            issue = self._add_issue('NEW', path, 'New asset found in target', 'Low')
+            self.report['summary']['new'] += 1
+            if self.detect_renames:
+                self._new.append((issue, target))
+        else:
+            # Both exist
+            self._compare_assets(source, target)
+
     def _compare_assets(self, source, target):
         # Check for errors first
         if 'error' in source.metadata or 'error' in target.metadata:
@@ -45,30 +123,52 @@ class Analyzer:
             return
 
         # Content Check
-        if source.content_hash != target.content_hash:
-            diff_details = self._get_content_diff(source, target)
-            self._add_issue('MODIFIED', source.path, 'Content differs between source and target', 'Medium', diff_details)
-            self.report['summary']['modified'] += 1
-            self.report['modified'].append(source.path)
+        cosmetic = False
+        if not self._same_content(source, target):
+            if source.canonical_hash and source.canonical_hash == target.canonical_hash:
+                # Canonical digests from the crawl show the change is formatting only; nothing to re-read
+                cosmetic = True
+                self._add_issue('COSMETIC', source.path, 'Formatting-only difference (key order, whitespace or line endings)', 'Low')
+                self.report['summary']['cosmetic'] += 1
+            else:
+                diff_details = self._get_content_diff(source, target)
+                self._add_issue('MODIFIED', source.path, 'Content differs between source and target', 'Medium', diff_details)
+                self.report['summary']['modified'] += 1
+                self.report['modified'].append(source.path)
         
         # Metadata Check (Permissions, Headers)
         # We filter out some volatile metadata like 'mtime' or 'Date' header
         source_meta = self._clean_metadata(source.metadata)
         target_meta = self._clean_metadata(target.metadata)
-        
+        if cosmetic:
+            # A reformatted file changes size without any configuration drift
+            source_meta.pop('size', None)
+            target_meta.pop('size', None)
+        if ('permissions' in source_meta) != ('permissions' in target_meta):
+            # Zip archives written on Windows record no modes; that is not drift
+            source_meta.pop('permissions', None)
+            target_meta.pop('permissions', None)
+
         if source_meta != target_meta:
              meta_diff = self._dict_diff(source_meta, target_meta)
              self._add_issue('METADATA_MISMATCH', source.path, 'Metadata configuration drift detected', 'Medium', str(meta_diff))
              self.report['summary']['metadata_mismatch'] += 1
 
+    def _same_content(self, source, target):
+        # Staged comparison for large files whose digests were deferred at crawl time:
+        # sizes first, then head/tail samples, and a full digest only if both match.
+        if (source.hash_deferred or target.hash_deferred) and source.file_path and target.file_path:
+            if source.metadata.get('size') != target.metadata.get('size'):
+                return False
+            try:
+                if source.sample_hash() != target.sample_hash():
+                    return False
+            except OSError:
+                pass # Fall back to the full digest
+        return source.content_hash == target.content_hash
+
     def _clean_metadata(self, metadata):
-        # Remove volatile fields
-        clean = metadata.copy()
-        clean.pop('mtime', None)
-        clean.pop('Date', None) # HTTP header
-        clean.pop('Last-Modified', None) # HTTP header
-        clean.pop('Etag', None) # HTTP header
-        return clean
+        return clean_metadata(metadata)
 
     def _dict_diff(self, d1, d2):
         diff = {}
@@ -83,33 +183,272 @@ class Analyzer:
         return diff
 
     def _get_content_diff(self, source, target):
-        # Try to parse as JSON or YAML for structured diff
-        try:
-            s_obj = self._parse_structured(source.content)
-            t_obj = self._parse_structured(target.content)
-            if s_obj and t_obj:
-                return str(self._dict_diff(s_obj, t_obj))
-        except:
-            pass
-        return "Binary or unstructured text difference"
-
-    def _parse_structured(self, content):
-        if not content: return None
-        try:
-            return json.loads(content)
-        except:
-            pass
-        try:
-            return yaml.safe_load(content)
-        except:
-            pass
-        return None
+        # Structured diff for JSON/YAML documents, a bounded line diff for other text.
+        # Binaries are never parsed, and nothing over the size budgets is loaded.
+        sizes = [asset.metadata.get('size') for asset in (source, target)]
+        if any(size is not None and size > textdiff.MAX_INPUT_SIZE for size in sizes):
+            return "Content differs (too large to diff)"
+
+        if not (source.content_available and target.content_available):
+            return "Content differs (digest-only snapshot, no content to diff)"
+
+        s_content = source.content
+        t_content = target.content
+        if not s_content or not t_content:
+            return "Binary or unstructured text difference"
+
+        fmt = structdiff.detect_format(source.path, s_content)
+        if (fmt is not None and structdiff.detect_format(target.path, t_content) == fmt and
+                max(len(s_content), len(t_content)) <= structdiff.MAX_DOCUMENT_SIZE):
+            try:
+                s_obj = structdiff.parse(fmt, s_content)
+                t_obj = structdiff.parse(fmt, t_content)
+                return structdiff.StructDiff().diff(s_obj, t_obj).render()
+            except Exception:
+                pass # Not valid JSON/YAML after all; fall back to a line diff
+
+        return textdiff.unified_diff(s_content, t_content, source.path, target.path) or "Binary content difference"
 
     def _add_issue(self, issue_type, path, description, severity, details=None):
-        self.report['details'].append({
+        issue = {
             'type': issue_type,
             'path': path,
             'description': description,
             'severity': severity,
             'details': details
-        })
+        }
+        self.report['details'].append(issue)
+        if self.on_issue:
+            self.on_issue(issue)
+        return issue
+
+    def _pair_renames(self):
+        # Pair each NEW asset with a MISSING asset of identical content. Candidates are
+        # bucketed by size first, so digests are only needed (and, for staged crawls,
+        # only computed) where sizes collide; the whole pass is linear in the
+        # number of unmatched assets.
+        if not self._missing or not self._new:
+            return
+
+        by_size = {}
+        for item in self._missing:
+            by_size.setdefault(item[1].metadata.get('size'), []).append(item)
+
+        by_digest = {} # size -> {digest: [missing items]}
+        renames = []
+        unmatched_new = []
+        for new_issue, new_asset in self._new:
+            size = new_asset.metadata.get('size')
+            if size not in by_size or 'error' in new_asset.metadata:
+                unmatched_new.append((new_issue, new_asset))
+                continue
+            index = by_digest.get(size)
+            if index is None:
+                index = by_digest[size] = {}
+                for item in by_size[size]:
+                    if item[1].content_hash and 'error' not in item[1].metadata:
+                        index.setdefault(item[1].content_hash, []).append(item)
+            candidates = index.get(new_asset.content_hash) if new_asset.content_hash else None
+            if candidates:
+                missing_issue, _ = candidates.pop(0)
+                renames.append((missing_issue, new_issue, None))
+            else:
+                unmatched_new.append((new_issue, new_asset))
+
+        if self.similar_renames:
+            paired = {id(missing_issue) for missing_issue, _, _ in renames}
+            unmatched_missing = [item for item in self._missing if id(item[0]) not in paired]
+            renames.extend(self._pair_similar(unmatched_missing, unmatched_new))
+
+        if renames:
+            self._apply_renames(renames)
+
+    def _pair_similar(self, missing, new):
+        # Near-identical text: only compare files that keep their name, and skip
+        # name buckets that would need too many comparisons.
+        by_name = {}
+        for item in missing:
+            by_name.setdefault(item[1].path.rsplit('/', 1)[-1], ([], []))[0].append(item)
+        for item in new:
+            name = item[1].path.rsplit('/', 1)[-1]
+            if name in by_name:
+                by_name[name][1].append(item)
+
+        renames = []
+        for name, (old_items, new_items) in by_name.items():
+            if not new_items or len(old_items) * len(new_items) > SIMILAR_MAX_PAIRS:
+                continue
+            texts = {}
+            for _, asset in old_items + new_items:
+                texts[id(asset)] = self._similarity_text(asset)
+
+            scored = []
+            for old_issue, old_asset in old_items:
+                for new_issue, new_asset in new_items:
+                    a, b = texts[id(old_asset)], texts[id(new_asset)]
+                    if a is None or b is None:
+                        continue
+                    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+                    if matcher.real_quick_ratio() < SIMILAR_MIN_RATIO or matcher.quick_ratio() < SIMILAR_MIN_RATIO:
+                        continue
+                    ratio = matcher.ratio()
+                    if ratio >= SIMILAR_MIN_RATIO:
+                        scored.append((ratio, old_issue, new_issue))
+
+            # Best matches first; each asset is paired at most once
+            used = set()
+            for ratio, old_issue, new_issue in sorted(scored, key=lambda x: -x[0]):
+                if id(old_issue) in used or id(new_issue) in used:
+                    continue
+                used.update((id(old_issue), id(new_issue)))
+                renames.append((old_issue, new_issue, ratio))
+        return renames
+
+    def _similarity_text(self, asset):
+        size = asset.metadata.get('size')
+        if size is None or size > SIMILAR_MAX_SIZE or 'error' in asset.metadata:
+            return None
+        content = asset.content
+        if not content or b'\0' in content[:1024]:
+            return None
+        return content.decode('utf-8', errors='ignore').splitlines()
+
+    def _apply_renames(self, renames):
+        # The MISSING issue becomes the RENAMED issue (keeping its place in path order)
+        # and the matching NEW issue is dropped.
+        summary = self.report['summary']
+        dropped = set()
+        moved_from = set()
+        for missing_issue, new_issue, ratio in renames:
+            old_path, new_path = missing_issue['path'], new_issue['path']
+            if ratio is None:
+                missing_issue.update({
+                    'type': 'RENAMED',
+                    'description': f"Asset moved to {new_path} with identical content",
+                    'severity': 'Low',
+                    'details': f"{old_path} -> {new_path}"
+                })
+            else:
+                missing_issue.update({
+                    'type': 'RENAMED',
+                    'description': f"Asset moved to {new_path} with modified content",
+                    'severity': 'Medium',
+                    'details': f"{old_path} -> {new_path} (similarity {ratio:.2f})"
+                })
+            dropped.add(id(new_issue))
+            moved_from.add(old_path)
+            summary['missing'] -= 1
+            summary['new'] -= 1
+            summary['renamed'] += 1
+
+        self.report['details'] = [issue for issue in self.report['details'] if id(issue) not in dropped]
+        self.report['removed_in_prod'] = [path for path in self.report['removed_in_prod'] if path not in moved_from]
+
+class MatrixAnalyzer:
+    """
+    Compares N environments in one pass. Every path that is not identical in all of
+    them becomes one matrix row with a cell per environment: a variant letter ('A' is
+    the first distinct content in environment order, 'B' the next, ...), '-' where the
+    path is absent and '!' for crawl errors. A '*' marks metadata drift from the first
+    environment that has the path.
+    """
+    # Severity per row class, matching the pairwise report
+    SEVERITY = {'ERROR': 'Critical', 'MISSING': 'High', 'MODIFIED': 'Medium', 'COSMETIC': 'Low', 'METADATA_MISMATCH': 'Medium'}
+    SUMMARY_KEYS = {'ERROR': 'errors', 'MISSING': 'missing', 'MODIFIED': 'modified', 'COSMETIC': 'cosmetic',
+                    'METADATA_MISMATCH': 'metadata_mismatch'}
+
+    def __init__(self, environments):
+        # [(name, assets, tree)] in display order; the first one is the baseline
+        self.environments = environments
+        self.report = {
+            'environments': [name for name, _, _ in environments],
+            'summary': {'paths': 0, 'missing': 0, 'modified': 0, 'cosmetic': 0, 'metadata_mismatch': 0, 'errors': 0,
+                        'drift_from_baseline': {name: 0 for name, _, _ in environments[1:]}},
+            'matrix': []
+        }
+
+    def analyze(self):
+        _, base_assets, base_tree = self.environments[0]
+        trees = [tree for _, _, tree in self.environments]
+        if all(trees):
+            # A path that matches the baseline everywhere matches everywhere, so the
+            # baseline's pairwise Merkle diffs cover every row
+            paths = set()
+            for tree in trees[1:]:
+                paths |= base_tree.diff_paths(tree)
+        else:
+            paths = set()
+            for _, assets, _ in self.environments:
+                paths |= set(assets.keys())
+
+        for path in sorted(paths):
+            row = self._compare_path(path, [assets.get(path) for _, assets, _ in self.environments])
+            if row:
+                self.report['matrix'].append(row)
+        return self.report
+
+    def _compare_path(self, path, assets):
+        names = self.report['environments']
+        present = [asset for asset in assets if asset is not None]
+        valid = [asset for asset in present if 'error' not in asset.metadata]
+
+        # Content variants, lettered in environment order (each digest is computed once per asset)
+        letters = {}
+        for asset in valid:
+            if asset.content_hash not in letters:
+                letters[asset.content_hash] = chr(ord('A') + len(letters)) if len(letters) < 26 else '?'
+        canonicals = {asset.canonical_hash for asset in valid}
+        cosmetic = len(letters) > 1 and None not in canonicals and len(canonicals) == 1
+
+        # Metadata is compared against the first environment that has the path
+        reference = None
+        cells = {}
+        drifted = False
+        for name, asset in zip(names, assets):
+            if asset is None:
+                cells[name] = '-'
+            elif 'error' in asset.metadata:
+                cells[name] = '!'
+            else:
+                meta = self._comparable_metadata(asset, present)
+                if reference is None:
+                    reference = meta
+                cells[name] = letters[asset.content_hash] + ('*' if meta != reference else '')
+                drifted = drifted or meta != reference
+
+        if len(valid) < len(present):
+            row_class = 'ERROR'
+        elif len(present) < len(assets):
+            row_class = 'MISSING'
+        elif cosmetic:
+            row_class = 'COSMETIC'
+        elif len(letters) > 1:
+            row_class = 'MODIFIED'
+        elif drifted:
+            row_class = 'METADATA_MISMATCH'
+        else:
+            return None # Identical everywhere (reached when a tree was not available)
+
+        summary = self.report['summary']
+        summary['paths'] += 1
+        summary[self.SUMMARY_KEYS[row_class]] += 1
+        for name in names[1:]:
+            if cells[name] != cells[names[0]]:
+                summary['drift_from_baseline'][name] += 1
+
+        return {
+            'path': path,
+            'class': row_class,
+            'severity': self.SEVERITY[row_class],
+            'cells': cells,
+            'digests': {letter: digest for digest, letter in letters.items()}
+        }
+
+    def _comparable_metadata(self, asset, present):
+        meta = clean_metadata(asset.metadata)
+        # Size follows content, which the variant letter already shows
+        meta.pop('size', None)
+        if not all('permissions' in other.metadata for other in present):
+            # Zip archives written on Windows record no modes; that is not drift
+            meta.pop('permissions', None)
+        return meta
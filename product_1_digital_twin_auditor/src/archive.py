@@ -0,0 +1,110 @@
+import time
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+
+# Archive formats a crawl can read in place, by file name suffix
+ZIP_EXTS = ('.zip', '.jar', '.war', '.ear')
+TAR_EXTS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+# Nested archives are opened through a temporary copy that stays in memory up
+# to this size and spills to a temporary file beyond it
+NESTED_SPOOL_SIZE = 64 * 1024 * 1024
+
+# Read size when streaming members (matches crawler.CHUNK_SIZE)
+CHUNK_SIZE = 1024 * 1024
+
+# Separates an archive's path from its members: 'lib/inner.jar!/com/app/Main.class'
+MEMBER_SEPARATOR = '!/'
+
+ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, zipfile.LargeZipFile, tarfile.TarError)
+
+def archive_kind(path):
+    """'zip' or 'tar' for archive file names, otherwise None."""
+    name = path.lower()
+    if name.endswith(ZIP_EXTS):
+        return 'zip'
+    if name.endswith(TAR_EXTS):
+        return 'tar'
+    return None
+
+def iter_members(fileobj, kind):
+    """
+    Yield (name, size, mode, mtime, stream) for each regular file in the archive.
+    mode is None when the archive does not record Unix permissions. Each stream
+    is only readable until the next member is requested; tar archives are read
+    strictly front to back, so compressed tarballs are never seeked.
+    """
+    if kind == 'zip':
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                # Only archives written on Unix (create_system 3) carry a mode
+                mode = (info.external_attr >> 16) & 0o777 if info.create_system == 3 else 0
+                try:
+                    mtime = time.mktime(info.date_time + (0, 0, -1))
+                except (OverflowError, ValueError):
+                    mtime = 0.0
+                with zf.open(info) as stream:
+                    yield _member_name(info.filename), info.file_size, mode or None, mtime, stream
+    else:
+        with tarfile.open(fileobj=fileobj, mode='r|*') as tf:
+            for info in tf:
+                if not info.isfile():
+                    continue
+                yield _member_name(info.name), info.size, info.mode & 0o777, float(info.mtime), tf.extractfile(info)
+
+def spool(stream):
+    """
+    Copy a member stream into a seekable temporary file, hashing it on the way.
+    Returns (hexdigest, file positioned at 0); the caller closes the file.
+    """
+    digest = hashlib.sha256()
+    spooled = tempfile.SpooledTemporaryFile(max_size=NESTED_SPOOL_SIZE)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        spooled.write(chunk)
+    spooled.seek(0)
+    return digest.hexdigest(), spooled
+
+def read_member(archive_path, chain):
+    """
+    Bytes of one member. chain lists member names from the outermost archive
+    inward, e.g. ('WEB-INF/lib/inner.jar', 'config.properties').
+    """
+    with open(archive_path, 'rb') as f:
+        return _read_chain(f, archive_kind(archive_path), chain)
+
+def _read_chain(fileobj, kind, chain):
+    name, rest = chain[0], chain[1:]
+    if kind == 'zip':
+        # Zip members are found through the central directory, without a scan
+        with zipfile.ZipFile(fileobj) as zf:
+            info = next((i for i in zf.infolist() if _member_name(i.filename) == name), None)
+            if info is None:
+                return None
+            with zf.open(info) as stream:
+                return _read_stream(stream, name, rest)
+    for member, _, _, _, stream in iter_members(fileobj, kind):
+        if member == name:
+            return _read_stream(stream, name, rest)
+    return None
+
+def _read_stream(stream, name, rest):
+    if not rest:
+        return stream.read()
+    _, spooled = spool(stream)
+    with spooled:
+        return _read_chain(spooled, archive_kind(name), rest)
+
+def _member_name(name):
+    # Archive paths are '/'-separated already; drop './' and '/' prefixes some tools add
+    name = name.replace('\\', '/')
+    while name.startswith('./'):
+        name = name[2:]
+    return name.lstrip('/')
@@ -0,0 +1,178 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Files modified this recently are not cached: a write landing in the same
+# mtime tick as our read would otherwise leave a stale digest behind.
+RACY_WINDOW_SECONDS = 2
+
+class HashCache:
+    """
+    On-disk manifest of previously hashed files, stored in SQLite.
+    An entry is reused only when path, size, mtime_ns and inode all match the current stat.
+    """
+
+    # Bumped when the row layout or the meaning of a stored digest changes
+    # (3: .env canonical digests keep quotes and the last assignment only;
+    #  4: JS imports after '}' regexes, and obj.import() is not a dependency)
+    SCHEMA_VERSION = 4
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.entries = {} # abs path -> (size, mtime_ns, inode, content_hash, dependencies, canonical_hash)
+        self.updates = {}
+        self.seen = {} # root prefix -> paths under it looked up since load(root)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # One cache serves every crawler of a run, and those crawl concurrently;
+        # all access is serialised with self._lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            # Unknown layout; start over rather than trust old rows
+            self.conn.execute('DROP TABLE IF EXISTS files')
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, '
+            'content_hash TEXT, dependencies TEXT, canonical_hash TEXT)'
+        )
+        self.conn.commit()
+
+    def load(self, root):
+        # Pull every entry under root into memory so crawl workers can look up without touching SQLite
+        prefix = self._prefix(root)
+        with self._lock:
+            # Two crawls of the same root at once share one set; the first save prunes
+            self.seen.setdefault(prefix, set())
+            rows = self.conn.execute(
+                'SELECT path, size, mtime_ns, inode, content_hash, dependencies, canonical_hash FROM files '
+                'WHERE substr(path, 1, ?) = ?', (len(prefix), prefix)
+            ).fetchall()
+            for path, size, mtime_ns, inode, content_hash, dependencies, canonical_hash in rows:
+                self.entries[path] = (size, mtime_ns, inode, content_hash, json.loads(dependencies), canonical_hash)
+        logger.info(f"Loaded {len(rows)} cached entries for {root}")
+
+    def lookup(self, full_path, stat):
+        """Return (content_hash, dependencies, canonical_hash) if the cached entry matches stat, else None."""
+        key = self._key(full_path)
+        with self._lock:
+            for prefix, seen in self.seen.items():
+                if key.startswith(prefix):
+                    seen.add(key)
+            entry = self.entries.get(key)
+            if entry and entry[:3] == (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                self.hits += 1
+                return entry[3], entry[4], entry[5]
+            self.misses += 1
+        return None
+
+    def store(self, full_path, stat, content_hash, dependencies, canonical_hash=None):
+        if time.time() - stat.st_mtime < RACY_WINDOW_SECONDS:
+            return
+        with self._lock:
+            self.updates[self._key(full_path)] = (stat.st_size, stat.st_mtime_ns, stat.st_ino, content_hash, dependencies, canonical_hash)
+
+    def save(self, root):
+        """
+        Write new digests, and forget cached files under root that its crawl did
+        not see. Entries under other roots are left to their own crawls.
+        """
+        prefix = self._prefix(root)
+        with self._lock, self.conn:
+            seen = self.seen.pop(prefix, None)
+            if seen is not None:
+                stale = [path for path in self.entries if path.startswith(prefix) and path not in seen]
+                self.conn.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in stale])
+                for path in stale:
+                    del self.entries[path]
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(path, size, mtime_ns, inode, content_hash, json.dumps(deps), canonical_hash)
+                 for path, (size, mtime_ns, inode, content_hash, deps, canonical_hash) in self.updates.items()]
+            )
+            self.entries.update(self.updates)
+            self.updates = {}
+            logger.info(f"Hash cache: {self.hits} hits, {self.misses} misses so far")
+
+    def close(self):
+        self.conn.close()
+
+    def _key(self, path):
+        return os.path.abspath(path)
+
+    def _prefix(self, root):
+        return self._key(root).rstrip(os.sep) + os.sep
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP responses for URL crawls, stored in SQLite.
+    Keeps the validators (ETag / Last-Modified) so re-crawls can send conditional
+    requests and reuse the stored body and digest on a 304.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+        # Shared by all fetch threads; access is serialised with self._lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self.conn.execute('DROP TABLE IF EXISTS responses')
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, status_code INTEGER, headers TEXT, body BLOB, content_hash TEXT)'
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """Return (status_code, headers, body, content_hash) for a cached url, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT status_code, headers, body, content_hash FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status_code, headers, body, content_hash = row
+        return status_code, json.loads(headers), body, content_hash
+
+    def store(self, url, status_code, headers, body, content_hash):
+        if not validators(headers):
+            return # Nothing to revalidate against
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (url, status_code, json.dumps(headers), body, content_hash)
+            )
+
+    def refresh(self, url, headers):
+        # A 304 may carry updated validators; the stored body is still current
+        with self._lock, self.conn:
+            self.revalidated += 1
+            self.conn.execute('UPDATE responses SET headers = ? WHERE url = ?', (json.dumps(headers), url))
+
+    def close(self):
+        logger.info(f"Response cache: {self.revalidated} pages revalidated (304)")
+        self.conn.close()
+
+def validators(headers):
+    """Conditional request headers for a cached response (empty if it has no ETag/Last-Modified)."""
+    lowered = {k.lower(): v for k, v in headers.items()}
+    conditional = {}
+    if lowered.get('etag'):
+        conditional['If-None-Match'] = lowered['etag']
+    if lowered.get('last-modified'):
+        conditional['If-Modified-Since'] = lowered['last-modified']
+    return conditional
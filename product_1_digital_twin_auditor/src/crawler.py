@@ -1,20 +1,112 @@
 import os
 import hashlib
 import requests
-from urllib.parse import urlparse, urljoin
+import requests.adapters
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urlparse, urljoin, urldefrag
 import re
 import logging
+import threading
+import queue
+from functools import partial
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .merkle import MerkleTree
+from .cache import validators
+from .normalize import canonical_kind, canonical_digest, CANONICAL_MAX_SIZE
+from .dependencies import DependencyExtractor, DEPENDENCY_EXTS, BATCH_FILES, BATCH_BYTES
+from .archive import archive_kind, iter_members, spool, read_member, MEMBER_SEPARATOR, ARCHIVE_ERRORS
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Files are hashed in fixed-size chunks so memory use does not grow with file size
+CHUNK_SIZE = 1024 * 1024
+
+# Staged hashing: files at least this large are not hashed during the crawl. The analyzer
+# compares sizes, then SAMPLE_SIZE head/tail blocks, and computes a full digest only if both match.
+STAGED_MIN_SIZE = 1024 * 1024
+SAMPLE_SIZE = 64 * 1024
+
+# Archive sources: how many levels of archives nested inside the source are opened
+DEFAULT_ARCHIVE_DEPTH = 1
+
+# URL crawl defaults
+DEFAULT_URL_WORKERS = 8
+DEFAULT_PER_HOST = 8
+
+# Shadow IT extensions to watch for
+SHADOW_IT_EXTS = {'.exe', '.bat', '.sh', '.ps1', '.vbs', '.msi', '.jar', '.war'}
+
 class Asset:
-    def __init__(self, path, asset_type, content=None, metadata=None):
+    def __init__(self, path, asset_type, content=None, metadata=None, file_path=None, content_hash=None, defer_hash=False,
+                 canonical_hash=None, loader=None):
         self.path = path
         self.asset_type = asset_type
-        self.content = content
+        self.file_path = file_path # On-disk location; content is read from here on demand
+        self.loader = loader # Or a callable returning the bytes (e.g. an archive member)
+        self._content = content
         self.metadata = metadata or {}
-        self.content_hash = self._compute_hash(content)
+        # Digest of the normalized content (see normalize.py); equal canonical hashes mean cosmetic-only drift
+        self.canonical_hash = canonical_hash
+        # With defer_hash the file is only hashed when content_hash is first read
+        self._defer_hash = defer_hash and content_hash is None and file_path is not None
+        self._content_hash = content_hash if content_hash is not None else self._compute_hash(content)
+        self._sample_hash = None
+
+    @property
+    def content_hash(self):
+        if self._defer_hash:
+            self._defer_hash = False
+            try:
+                self._content_hash, _ = hash_file(self.file_path)
+            except OSError as e:
+                logger.error(f"Error hashing file {self.file_path}: {e}")
+        return self._content_hash
+
+    @content_hash.setter
+    def content_hash(self, value):
+        self._defer_hash = False
+        self._content_hash = value
+
+    @property
+    def hash_deferred(self):
+        return self._defer_hash
+
+    def sample_hash(self):
+        """Digest of the size plus the first and last SAMPLE_SIZE bytes (cheap pre-check for large files)."""
+        if self._sample_hash is None:
+            self._sample_hash = sample_file(self.file_path)
+        return self._sample_hash
+
+    @property
+    def content_available(self):
+        # False for digest-only assets, such as those read from a snapshot
+        return self._content is not None or self.file_path is not None or self.loader is not None
+
+    @property
+    def content(self):
+        # File assets keep only a reference; the bytes are loaded each time they are needed
+        # (e.g. by Analyzer._get_content_diff) and are not retained on the asset.
+        if self._content is not None:
+            return self._content
+        if self.file_path is None:
+            return self._load()
+        try:
+            with open(self.file_path, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            logger.warning(f"Could not load content for {self.path}: {e}")
+            return None
+
+    def _load(self):
+        if self.loader is None:
+            return None
+        try:
+            return self.loader()
+        except ARCHIVE_ERRORS as e:
+            logger.warning(f"Could not load content for {self.path}: {e}")
+            return None
 
     def _compute_hash(self, content):
         if content is None:
@@ -26,115 +118,495 @@ class Asset:
     def __repr__(self):
         return f"<Asset path={self.path} type={self.asset_type} hash={self.content_hash[:8] if self.content_hash else 'None'}>"
 
+def hash_file(full_path, keep_content=False):
+    """Hash a file in CHUNK_SIZE blocks. Returns (hexdigest, content or None)."""
+    with open(full_path, 'rb') as f:
+        return hash_stream(f, keep_content)
+
+def hash_stream(stream, keep_content=False):
+    digest = hashlib.sha256()
+    chunks = [] if keep_content else None
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        if keep_content:
+            chunks.append(chunk)
+    return digest.hexdigest(), (b''.join(chunks) if keep_content else None)
+
+def sample_file(full_path, block=SAMPLE_SIZE):
+    digest = hashlib.sha256()
+    with open(full_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(str(size).encode('ascii'))
+        digest.update(f.read(block))
+        if size > block:
+            f.seek(max(block, size - block))
+            digest.update(f.read(block))
+    return digest.hexdigest()
+
+def prefetch(iterable, maxsize=1024):
+    # Runs the iterable on a background thread and yields its items through a
+    # bounded queue, so a consumer can work while the producer keeps crawling.
+    items = queue.Queue(maxsize=maxsize)
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception as e:
+            items.put(e)
+        items.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
 class Crawler:
-    def __init__(self, base_uri):
+    def __init__(self, base_uri, workers=None, cache=None, http_cache=None, max_depth=3, max_pages=500, per_host=DEFAULT_PER_HOST, compact=False, staged=False,
+                 extractor=None, ignore=None, archive_depth=DEFAULT_ARCHIVE_DEPTH, agent_token=None):
         self.base_uri = base_uri
+        self.workers = workers # None: serial for directories, DEFAULT_URL_WORKERS for URLs
+        self.max_depth = max_depth # URL crawls: link depth from the start page
+        self.max_pages = max_pages # URL crawls: page budget
+        self.per_host = per_host # URL crawls: concurrent requests per host
+        self.compact = compact # Directory crawls: store assets in an AssetManifest instead of a dict
+        self.staged = staged # Directory crawls: defer hashing of large files to the analyzer
+        self.cache = cache # Optional HashCache reused across runs; may be shared between crawlers
+        self.http_cache = http_cache # Optional ResponseCache for conditional URL re-crawls
+        self.extractor = extractor or DependencyExtractor() # May be shared between crawlers
+        self.ignore = ignore # Optional IgnoreRules; matching directories are pruned during the walk
+        self.ignore_stats = {} # Rule pattern -> files, bytes and directories it skipped
+        self.archive_depth = archive_depth # Archive sources: nesting levels of inner archives to open
+        self.agent_token = agent_token # agent:// sources: shared secret sent to the agent
         self.is_url = base_uri.startswith('http://') or base_uri.startswith('https://')
+        # agent://host:port is a crawl served by a remote agent (see agent.py)
+        self.is_agent = base_uri.startswith('agent://')
+        is_file = not self.is_url and not self.is_agent and os.path.isfile(base_uri)
+        # A snapshot written by --export-snapshot stands in for a live crawl
+        self.is_snapshot = is_file and self._sniff_snapshot(base_uri)
+        # A .zip/.jar/.war/.tar.gz file is crawled in place, member by member
+        self.is_archive = is_file and not self.is_snapshot and archive_kind(base_uri) is not None
         self.assets = {} # Map path -> Asset
+        self.tree = None # MerkleTree of directory digests (directory crawls only)
 
     def crawl(self):
         logger.info(f"Starting crawl for: {self.base_uri}")
         if self.is_url:
             self._crawl_url(self.base_uri)
+        elif self.is_agent:
+            self._connect_agent(self.base_uri)
+        elif self.is_snapshot:
+            from .snapshot import load_snapshot
+            self.tree = load_snapshot(self.assets, self.base_uri)
+        elif self.is_archive:
+            self._crawl_archive(self.base_uri)
         else:
             self._crawl_dir(self.base_uri)
         return self.assets
 
+    def iter_assets(self):
+        """
+        Yield assets in sorted path order while crawling, without building self.assets.
+        Directory walks and snapshots stream; URL and archive crawls are fetched first and then yielded sorted.
+        """
+        if self.is_agent:
+            self._connect_agent(self.base_uri)
+            for path in self.assets.keys():
+                yield self.assets[path]
+            return
+        if self.is_snapshot:
+            from .snapshot import read_snapshot
+            _, assets = read_snapshot(self.base_uri)
+            yield from assets
+            return
+        if self.is_url or self.is_archive:
+            self.crawl()
+            for path in sorted(self.assets):
+                yield self.assets[path]
+            return
+
+        logger.info(f"Starting streaming crawl for: {self.base_uri}")
+        if self.cache:
+            self.cache.load(self.base_uri)
+        for _, asset in self._build_assets(self._walk(self.base_uri)):
+            yield asset
+        if self.cache:
+            self.cache.save(self.base_uri)
+
+    def _connect_agent(self, uri):
+        # Nothing is transferred up front: the analyzer's diff_paths walks the remote
+        # tree, and assets and content are fetched only where the trees differ.
+        from .agent import AgentClient, RemoteTree, RemoteAssets
+        client = AgentClient(uri, self.agent_token)
+        info = client.get_json('/info')
+        self.tree = RemoteTree(client)
+        self.assets = RemoteAssets(client, self.tree, info['count'])
+        logger.info(f"Connected to agent {uri} ({info['count']} assets)")
+
+    def _sniff_snapshot(self, path):
+        from .snapshot import is_snapshot
+        return is_snapshot(path)
+
     def _crawl_dir(self, directory):
-        # Shadow IT extensions to watch for
-        SHADOW_IT_EXTS = {'.exe', '.bat', '.sh', '.ps1', '.vbs', '.msi', '.jar', '.war'}
-        
-        for root, _, files in os.walk(directory):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, self.base_uri).replace('\\', '/')
-                _, ext = os.path.splitext(file)
-                
-                try:
-                    with open(full_path, 'rb') as f:
-                        content = f.read()
-                    
-                    stat = os.stat(full_path)
-                    metadata = {
-                        'size': stat.st_size,
-                        'permissions': oct(stat.st_mode)[-3:],
-                        'mtime': stat.st_mtime
-                    }
-                    
-                    # Shadow IT Detection
-                    if ext.lower() in SHADOW_IT_EXTS:
-                        metadata['shadow_it_flag'] = True
-                        metadata['shadow_reason'] = f"Unmanaged executable format: {ext}"
-                    
-                    # Dependency Extraction (Python/JS)
-                    dependencies = []
-                    try:
-                        text_content = content.decode('utf-8', errors='ignore')
-                        if ext.lower() == '.py':
-                            dependencies.extend(re.findall(r'^(?:import|from)\s+([\w\.]+)', text_content, re.MULTILINE))
-                        elif ext.lower() in ['.js', '.ts']:
-                            dependencies.extend(re.findall(r'require\([\'"]([^\'"]+)[\'"]\)', text_content))
-                            dependencies.extend(re.findall(r'import\s+.*\s+from\s+[\'"]([^\'"]+)[\'"]', text_content))
-                    except:
-                        pass
-                    
-                    if dependencies:
-                        metadata['dependencies'] = list(set(dependencies))
-
-                    self.assets[rel_path] = Asset(rel_path, 'file', content, metadata)
-                except Exception as e:
-                    logger.error(f"Error reading file {full_path}: {e}")
-                    self.assets[rel_path] = Asset(rel_path, 'file', None, {'error': str(e)})
-
-    def _crawl_url(self, url, visited=None):
-        # Basic depth-1 crawler for now to avoid infinite loops in this MVP
-        # In a real scenario, this would be more robust with depth control.
-        # We will focus on the provided URL and its immediate internal links.
-        if visited is None:
-            visited = set()
-        
-        parsed_base = urlparse(self.base_uri)
-        parsed_current = urlparse(url)
-        
-        if parsed_current.netloc != parsed_base.netloc:
-            return # Skip external links
-
-        rel_path = parsed_current.path
-        if rel_path == '': rel_path = '/'
-        
-        if rel_path in self.assets:
+        if self.compact:
+            # Columnar manifest; the per-file Merkle leaves would cost more than they save here
+            from .manifest import AssetManifest
+            self.assets = AssetManifest(directory)
+        elif not self.staged:
+            # Merkle leaves need every digest, which staged mode deliberately defers
+            self.tree = MerkleTree()
+        if self.cache:
+            self.cache.load(directory)
+
+        for rel_path, asset in self._build_assets(self._walk(directory)):
+            self.assets[rel_path] = asset
+            if self.tree:
+                self.tree.add(asset)
+        if self.tree:
+            self.tree.finalize()
+
+        if self.cache:
+            self.cache.save(directory)
+
+    def _build_assets(self, walk):
+        if not self.extractor.pooled:
+            for rel_path, asset, _ in self._read_assets(walk, False):
+                yield rel_path, asset
             return
 
-        visited.add(url)
-        
+        # Imports are parsed in the extractor's processes, a batch of files per
+        # task, with a batch per process in flight while the crawl reads on.
+        # Assets wait in their batch, so they still come out in walk order.
+        batches = deque()
+        batch, jobs, size = [], [], 0
+        for item in self._read_assets(walk, True):
+            batch.append(item)
+            parse = item[2]
+            if parse:
+                jobs.append(parse[:3])
+                size += len(parse[2])
+            if len(jobs) >= BATCH_FILES or size >= BATCH_BYTES or len(batch) >= BATCH_FILES * 16:
+                batches.append((batch, self.extractor.submit(jobs)))
+                batch, jobs, size = [], [], 0
+                if len(batches) > self.extractor.workers:
+                    yield from self._finish_batch(*batches.popleft())
+        batches.append((batch, self.extractor.submit(jobs)))
+        while batches:
+            yield from self._finish_batch(*batches.popleft())
+
+    def _read_assets(self, walk, defer_parse):
+        if not self.workers or self.workers <= 1:
+            yield from map(partial(self._read_asset, defer_parse=defer_parse), walk)
+            return
+
+        # File reads, hashing and dependency extraction fan out to a thread pool.
+        # Results are yielded in walk order, so the assets dict is identical
+        # to the serial crawl. Only a bounded window of files is in flight.
+        window = self.workers * 4
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for paths in walk:
+                pending.append(executor.submit(self._read_asset, paths, defer_parse))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _finish_batch(self, batch, result):
+        # Fills in the imports parsed for a batch and yields its (rel_path, asset)
+        parsed = iter(result())
+        for rel_path, asset, parse in batch:
+            if parse:
+                ext, content_hash, _, full_path, stat, canonical_hash = parse
+                dependencies = next(parsed)
+                if dependencies:
+                    asset.metadata['dependencies'] = dependencies
+                if self.cache:
+                    self.cache.store(full_path, stat, content_hash, dependencies, canonical_hash)
+            yield rel_path, asset
+
+    def _walk(self, directory, prefix=''):
+        # os.scandir based depth-first walk; yields (full_path, rel_path) for every
+        # file in sorted rel_path order. Only the open directory listings along the
+        # current branch are held in memory. prefix is directory's own rel path + '/'
+        # when walking below the crawl root.
+        stack = [(iter(self._list_dir(directory)), prefix)]
+        while stack:
+            listing, prefix = stack[-1]
+            item = next(listing, None)
+            if item is None:
+                stack.pop()
+                continue
+            _, entry, is_dir = item
+            rel_path = prefix + entry.name
+            if self.ignore and self._ignored(entry, rel_path, is_dir):
+                continue
+            if is_dir:
+                # Like os.walk, symlinked directories are not followed
+                if not entry.is_symlink():
+                    stack.append((iter(self._list_dir(entry.path)), rel_path + '/'))
+            else:
+                yield entry.path, rel_path
+
+    def _ignored(self, entry, rel_path, is_dir):
+        rule = self.ignore.match(rel_path, is_dir)
+        if rule is None or rule.negated:
+            return False
+        stats = self.ignore_stats.setdefault(rule.pattern, {'files': 0, 'bytes': 0, 'dirs': 0})
+        if is_dir:
+            # Pruned: nothing below it is listed, so its contents are not counted
+            stats['dirs'] += 1
+        else:
+            stats['files'] += 1
+            try:
+                stats['bytes'] += entry.stat().st_size
+            except OSError:
+                pass
+        return True
+
+    def _list_dir(self, directory):
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.error(f"Error listing directory {directory}: {e}")
+            return []
+
+        items = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            # Directories sort as 'name/' so the walk matches sorted() over full paths
+            items.append((entry.name + '/' if is_dir else entry.name, entry, is_dir))
+        items.sort(key=lambda item: item[0])
+        return items
+
+    def _build_asset(self, paths):
+        rel_path, asset, _ = self._read_asset(paths)
+        return rel_path, asset
+
+    def _read_asset(self, paths, defer_parse=False):
+        # Returns (rel_path, asset, parse). With defer_parse, a source file that needs
+        # parsing comes back without its imports, and parse holds (ext, content_hash,
+        # content, full_path, stat, canonical_hash) for _finish_batch; otherwise it is None.
+        full_path, rel_path = paths
+        _, ext = os.path.splitext(full_path)
+
+        try:
+            stat = os.stat(full_path)
+            cached = self.cache.lookup(full_path, stat) if self.cache else None
+            kind = canonical_kind(full_path) if stat.st_size <= CANONICAL_MAX_SIZE else None
+            parse = None
+            if cached:
+                # Unchanged since the last run: reuse digests and dependencies without reading
+                content_hash, dependencies, canonical_hash = cached
+            elif self.staged and stat.st_size >= STAGED_MIN_SIZE and ext.lower() not in DEPENDENCY_EXTS:
+                # Large file: leave hashing to the analyzer's staged comparison
+                content_hash, dependencies, canonical_hash = None, [], None
+            else:
+                # Only files we extract dependencies from or normalize are kept in memory,
+                # and only until that is done.
+                keep_content = ext.lower() in DEPENDENCY_EXTS or kind is not None
+                content_hash, content = hash_file(full_path, keep_content=keep_content)
+                canonical_hash = canonical_digest(kind, content) if kind else None
+                if defer_parse and content and ext.lower() in DEPENDENCY_EXTS:
+                    dependencies = []
+                    parse = (ext, content_hash, content, full_path, stat, canonical_hash)
+                else:
+                    dependencies = self.extractor.extract(ext, content_hash, content)
+                    if self.cache:
+                        self.cache.store(full_path, stat, content_hash, dependencies, canonical_hash)
+
+            metadata = self._file_metadata(ext, stat.st_size, stat.st_mode, stat.st_mtime, dependencies)
+            return rel_path, Asset(rel_path, 'file', metadata=metadata, file_path=full_path,
+                                   content_hash=content_hash, defer_hash=content_hash is None,
+                                   canonical_hash=canonical_hash), parse
+        except Exception as e:
+            logger.error(f"Error reading file {full_path}: {e}")
+            return rel_path, Asset(rel_path, 'file', None, {'error': str(e)}), None
+
+    def _file_metadata(self, ext, size, mode, mtime, dependencies):
+        metadata = {'size': size}
+        if mode:
+            metadata['permissions'] = oct(mode)[-3:]
+        metadata['mtime'] = mtime
+
+        # Shadow IT Detection
+        if ext.lower() in SHADOW_IT_EXTS:
+            metadata['shadow_it_flag'] = True
+            metadata['shadow_reason'] = f"Unmanaged executable format: {ext}"
+
+        if dependencies:
+            metadata['dependencies'] = dependencies
+        return metadata
+
+    def _crawl_archive(self, path):
+        # Members are hashed as they stream out of the archive; nothing is extracted to disk.
+        # Tar members arrive in archive order, so the assets are sorted afterwards.
+        self.tree = MerkleTree()
         try:
-            response = requests.get(url, timeout=10)
+            with open(path, 'rb') as f:
+                members = self._archive_assets(f, archive_kind(path), (), '', 0)
+        except ARCHIVE_ERRORS as e:
+            logger.error(f"Error reading archive {path}: {e}")
+            members = []
+        for rel_path, asset in sorted(members, key=lambda item: item[0]):
+            self.assets[rel_path] = asset
+            self.tree.add(asset)
+        self.tree.finalize()
+        logger.info(f"Crawled {len(self.assets)} members from {path}")
+
+    def _archive_assets(self, fileobj, archive_type, chain, prefix, depth):
+        # Returns (rel_path, asset) for every member of one archive, in archive order.
+        # Archives inside it are opened while depth < archive_depth and their members
+        # are listed under 'inner.jar!/'.
+        results = []
+        for name, size, mode, mtime, stream in iter_members(fileobj, archive_type):
+            rel_path = prefix + name
+            if self.ignore and self._ignored_member(rel_path, size):
+                continue
+            member_chain = chain + (name,)
+            _, ext = os.path.splitext(name)
+            loader = partial(read_member, self.base_uri, member_chain)
+            inner_type = archive_kind(name) if depth < self.archive_depth else None
+            try:
+                if inner_type:
+                    content_hash, spooled = spool(stream)
+                    with spooled:
+                        try:
+                            results.extend(self._archive_assets(spooled, inner_type, member_chain,
+                                                                rel_path + MEMBER_SEPARATOR, depth + 1))
+                        except ARCHIVE_ERRORS as e:
+                            # Still compared as an opaque file below
+                            logger.warning(f"Could not open nested archive {rel_path}: {e}")
+                    dependencies, canonical_hash = [], None
+                else:
+                    kind = canonical_kind(name) if size <= CANONICAL_MAX_SIZE else None
+                    keep_content = ext.lower() in DEPENDENCY_EXTS or kind is not None
+                    content_hash, content = hash_stream(stream, keep_content=keep_content)
+                    dependencies = self.extractor.extract(ext, content_hash, content)
+                    canonical_hash = canonical_digest(kind, content) if kind else None
+                metadata = self._file_metadata(ext, size, mode, mtime, dependencies)
+                results.append((rel_path, Asset(rel_path, 'file', metadata=metadata, content_hash=content_hash,
+                                                canonical_hash=canonical_hash, loader=loader)))
+            except ARCHIVE_ERRORS as e:
+                logger.error(f"Error reading archive member {rel_path}: {e}")
+                results.append((rel_path, Asset(rel_path, 'file', None, {'error': str(e)})))
+        return results
+
+    def _ignored_member(self, rel_path, size):
+        # Archives list members flat, so parent directories are checked per member
+        rule = self.ignore.excluded_by(rel_path, False)
+        if rule is None:
+            return False
+        stats = self.ignore_stats.setdefault(rule.pattern, {'files': 0, 'bytes': 0, 'dirs': 0})
+        stats['files'] += 1
+        stats['bytes'] += size
+        return True
+
+    def _crawl_url(self, start_url):
+        # Breadth-first crawl of internal links, one depth level at a time.
+        # Pages within a level are fetched concurrently over a shared keep-alive
+        # session; levels are processed in order so the set of pages kept under
+        # the page budget is the same on every run (and on both environments).
+        base_netloc = urlparse(self.base_uri).netloc
+        concurrency = self.workers or DEFAULT_URL_WORKERS
+        session = self._make_session(concurrency)
+        host_limits = {}
+
+        start_url, _ = urldefrag(start_url)
+        level = [start_url]
+        queued = {self._url_path(start_url)}
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for depth in range(self.max_depth + 1):
+                if not level:
+                    break
+                results = executor.map(lambda u: self._fetch_url(session, host_limits, u), level)
+
+                next_level = []
+                for url, (asset, links) in zip(level, results):
+                    self.assets[asset.path] = asset
+                    if depth == self.max_depth:
+                        continue
+                    for href in links:
+                        next_url, _ = urldefrag(urljoin(url, href))
+                        # Only crawl internal links
+                        if urlparse(next_url).netloc != base_netloc:
+                            continue
+                        rel_path = self._url_path(next_url)
+                        if rel_path in queued or len(queued) >= self.max_pages:
+                            continue
+                        queued.add(rel_path)
+                        next_level.append(next_url)
+                level = next_level
+
+        session.close()
+        logger.info(f"Crawled {len(self.assets)} pages from {self.base_uri}")
+
+    def _make_session(self, concurrency):
+        # One pooled session per crawl so connections are reused (keep-alive)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _fetch_url(self, session, host_limits, url):
+        rel_path = self._url_path(url)
+        host = urlparse(url).netloc
+        # setdefault is atomic, so all threads share one semaphore per host
+        limit = host_limits.setdefault(host, threading.BoundedSemaphore(self.per_host))
+
+        try:
+            cached = self.http_cache.get(url) if self.http_cache else None
+            request_headers = validators(cached[1]) if cached else {}
+            with limit:
+                response = session.get(url, headers=request_headers, timeout=10)
+
+            if cached and response.status_code == 304:
+                # Unchanged since the last crawl: reuse the stored body and digest
+                status_code, headers, content, content_hash = cached
+                headers.update(response.headers)
+                self.http_cache.refresh(url, headers)
+            else:
+                status_code, headers, content = response.status_code, dict(response.headers), response.content
+                content_hash = None
             metadata = {
-                'status_code': response.status_code,
-                'headers': dict(response.headers),
+                'status_code': status_code,
+                'headers': headers,
                 'url': url
             }
-            
-            content = response.content
-            self.assets[rel_path] = Asset(rel_path, 'url', content, metadata)
+
+            asset = Asset(rel_path, 'url', content, metadata, content_hash=content_hash)
+            if self.http_cache and content_hash is None:
+                self.http_cache.store(url, status_code, headers, content, asset.content_hash)
 
             # If HTML, find more links
-            if 'text/html' in response.headers.get('Content-Type', ''):
+            links = []
+            if 'text/html' in CaseInsensitiveDict(headers).get('Content-Type', ''):
                 # Simple regex link extraction instead of BS4
                 try:
                     text_content = content.decode('utf-8', errors='ignore')
                     links = re.findall(r'href=[\'"]?([^\'" >]+)', text_content)
-                    for href in links:
-                        next_url = urljoin(url, href)
-                        # Only crawl internal links
-                        if urlparse(next_url).netloc == parsed_base.netloc:
-                             # Limit recursion for MVP to avoid huge crawl times
-                             if next_url not in visited:
-                                 pass 
                 except Exception as e:
                     logger.warning(f"Error parsing links in {url}: {e}")
+            return asset, links
 
         except Exception as e:
             logger.error(f"Error crawling URL {url}: {e}")
-            self.assets[rel_path] = Asset(rel_path, 'url', None, {'error': str(e)})
+            return Asset(rel_path, 'url', None, {'error': str(e)}), []
 
+    def _url_path(self, url):
+        rel_path = urlparse(url).path
+        return rel_path or '/'
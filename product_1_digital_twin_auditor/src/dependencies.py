@@ -0,0 +1,374 @@
+import io
+import ast
+import re
+import tokenize
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Source files we decode for dependency extraction, by language
+LANGUAGES = {
+    '.py': 'python',
+    '.js': 'js', '.mjs': 'js', '.cjs': 'js', '.jsx': 'js',
+    '.ts': 'js', '.tsx': 'js',
+}
+DEPENDENCY_EXTS = set(LANGUAGES)
+
+def extract_dependencies(ext, content):
+    """Sorted, de-duplicated imports of a source file given its raw bytes."""
+    lang = LANGUAGES.get(ext.lower())
+    if lang is None or not content:
+        return []
+    text = content.decode('utf-8', errors='replace')
+    try:
+        found = python_imports(text) if lang == 'python' else js_imports(text)
+    except Exception as e:
+        logger.warning(f"Dependency extraction failed: {e}")
+        return []
+    # Sorted so the result does not depend on set ordering
+    return sorted(set(found))
+
+# --- Python ---
+
+def python_imports(text):
+    """
+    Modules imported anywhere in a Python file, including indented and relative
+    imports ('.utils', '..pkg.mod'). Falls back to the tokenizer when the file
+    does not parse (Python 2 sources, templates, partial files).
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return _python_imports_tokenize(text)
+
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            prefix = '.' * node.level
+            if node.module:
+                found.append(prefix + node.module)
+            else:
+                # from . import a, b: each name is a sibling module
+                found.extend(prefix + alias.name for alias in node.names if alias.name != '*')
+        elif isinstance(node, ast.Call) and node.args:
+            # __import__('x') and importlib.import_module('x') with a literal name
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+            arg = node.args[0]
+            if name in ('__import__', 'import_module') and isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                found.append(arg.value)
+    return found
+
+def _python_imports_tokenize(text):
+    # Token-level scan: only 'import'/'from' at the start of a logical line count,
+    # so keywords inside strings and comments never match.
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+            if tok.type not in (tokenize.COMMENT, tokenize.NL):
+                tokens.append(tok)
+    except (tokenize.TokenError, SyntaxError):
+        pass # Keep what was tokenized before the error
+
+    found = []
+    at_start = True
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.type in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT) or tok.string == ';':
+            at_start = True
+            i += 1
+            continue
+        if at_start and tok.type == tokenize.NAME and tok.string == 'import':
+            i += 1
+            while True:
+                name, i = _dotted_name(tokens, i)
+                if name:
+                    found.append(name)
+                if i < len(tokens) and tokens[i].string == 'as':
+                    i += 2
+                if i < len(tokens) and tokens[i].string == ',':
+                    i += 1
+                    continue
+                break
+        elif at_start and tok.type == tokenize.NAME and tok.string == 'from':
+            i += 1
+            prefix = ''
+            while i < len(tokens) and tokens[i].string in ('.', '...'):
+                prefix += tokens[i].string
+                i += 1
+            module, i = _dotted_name(tokens, i)
+            if module:
+                found.append(prefix + module)
+            elif prefix and i < len(tokens) and tokens[i].string == 'import':
+                i += 1
+                # from . import a, b as c / from . import (a, b)
+                while i < len(tokens) and (tokens[i].type == tokenize.NAME or tokens[i].string in ('(', ',')):
+                    if tokens[i].string == 'as':
+                        i += 2
+                        continue
+                    if tokens[i].type == tokenize.NAME:
+                        found.append(prefix + tokens[i].string)
+                    i += 1
+        else:
+            i += 1
+        at_start = False
+    return found
+
+def _dotted_name(tokens, i):
+    parts = []
+    while i < len(tokens) and tokens[i].type == tokenize.NAME and tokens[i].string != 'import':
+        parts.append(tokens[i].string)
+        i += 1
+        if i < len(tokens) and tokens[i].string == '.':
+            i += 1
+        else:
+            break
+    return '.'.join(parts), i
+
+# --- JavaScript / TypeScript ---
+
+# Skips code up to the next import/export/require or '/', in one match. Strings
+# and template literals are consumed whole, so keywords inside them are never
+# seen. It halts on the 'p' of import/export and the 'q' of require: both letters
+# are rare, so most of the file goes by in long runs of other characters.
+_JS_SKIP = re.compile(r'''(?:
+    [^'"`/pq]+
+  | p(?!ort\b) | (?<!\bim)(?<!\bex)p
+  | q(?!uire\b) | (?<!\bre)q
+  | "[^"\\\n]*(?:\\.[^"\\\n]*)*"? | '[^'\\\n]*(?:\\.[^'\\\n]*)*'?
+  | `[^`\\]*(?:\\.[^`\\]*)*`?
+)*''', re.X)
+# A run of comments and the whitespace after them
+_JS_COMMENTS = re.compile(r'(?:(?://[^\n]*|/\*.*?(?:\*/|\Z))\s*)+', re.S)
+
+_JS_TOKEN = re.compile(r'''
+    (?P<skip> \s+ | //[^\n]* | /\*.*?(?:\*/|\Z) )
+  | (?P<str> "[^"\\\n]*(?:\\.[^"\\\n]*)*"? | '[^'\\\n]*(?:\\.[^'\\\n]*)*'? )
+  | (?P<tpl> `[^`\\]*(?:\\.[^`\\]*)*`? )
+  | (?P<name> [A-Za-z_$][\w$]* )
+  | (?P<num> \d[\w.]* )
+  | (?P<punct> . )
+''', re.S | re.X)
+
+_JS_REGEX = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+
+# The usual statement shapes, matched whole before falling back to tokens:
+# require('x'), import('x'), import 'x', and import/export ... from 'x' with
+# a default name, {...} and/or * as name before 'from'
+_JS_STATEMENT = re.compile(r'''
+    (?:require|import) \s*\(\s* (?P<call> "[^"\\\n]*" | '[^'\\\n]*' )
+  | import \s* (?P<side> "[^"\\\n]*" | '[^'\\\n]*' )
+  | (?:import|export) \s+ (?:type\s+)? (?:[\w$]+\s*,?\s*)? (?:\{[^{}'"`/;]*\}|\*(?:\s*as\s+[\w$]+)?)?
+    \s* from \s* (?P<from> "[^"\\\n]*" | '[^'\\\n]*' )
+''', re.X)
+# Exports that name no module: declarations (export const/class/default/...)
+# and export {...} without a from '...'
+_JS_LOCAL_EXPORT = re.compile(r'''export\s+(?=(?!type\b)[A-Za-z_$])|export\s*\{[^{}'"`/;]*\}(?!\s*from\b)''')
+
+# After these a '/' starts a regex literal rather than a division
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                      'void', 'throw', 'yield', 'await', 'instanceof'}
+
+# A statement that reaches one of these without a from '...' imports nothing
+_JS_STATEMENT_END = {';', '=', '(', ':'}
+
+def js_imports(text):
+    """
+    Module specifiers from import/export-from statements, side-effect imports,
+    require('x') and dynamic import('x'). Comments, strings and template
+    literals are lexed as such, so code-like text inside them never matches.
+    """
+    found = []
+    if 'import' not in text and 'export' not in text and 'require' not in text:
+        return found
+    pos, end = 0, len(text)
+    comments = (0, 0) # Span of the last run of comments, which looking back steps over
+    while True:
+        pos = _JS_SKIP.match(text, pos).end()
+        if pos >= end:
+            return found
+        if text[pos] == '/':
+            comment = _JS_COMMENTS.match(text, pos)
+            if comment:
+                comments = comment.span()
+                pos = comment.end()
+            else:
+                pos = _js_slash(text, pos, _js_last(text, pos, comments))
+            continue
+        start = pos - 2 # Halted inside 'import', 'export' or 'require'
+        last = _js_last(text, start, comments)
+        if text[pos] == 'p' and last >= 0 and text[last] == '.':
+            pos += 1 # A property such as module.export
+            continue
+        pos = _js_statement(text, start, found)
+
+def _js_last(text, pos, comments):
+    # Index of the last character before pos that is code, not whitespace or in
+    # the comments span; -1 if there is none
+    pos -= 1
+    while pos >= 0:
+        if text[pos] in ' \t\r\n':
+            pos -= 1
+        elif comments[0] <= pos < comments[1]:
+            pos = comments[0] - 1
+        else:
+            break
+    return pos
+
+def _js_slash(text, pos, last):
+    # Past a '/' that opens no comment: a regex literal is skipped whole, a
+    # division is one character. last is the index of the code before it.
+    word = last
+    while word >= 0 and (text[word].isalnum() or text[word] in '_$'):
+        word -= 1
+    if word < last:
+        # After a name or number it is a division, unless the name is a keyword like return
+        regex_allowed = text[word + 1:last + 1] in _JS_REGEX_KEYWORDS
+    else:
+        # After an operator, '(', '{' or '}' it is a regex; after ')', ']' or a literal a division
+        regex_allowed = last < 0 or text[last] not in ')]\'"`'
+    m = _JS_REGEX.match(text, pos) if regex_allowed else None
+    return m.end() if m else pos + 1
+
+def _js_tokens(text, pos):
+    # Yields (kind, value, start); whitespace, comments and regex literals are dropped
+    end = len(text)
+    prev = None
+    while pos < end:
+        if text[pos] == '/' and text[pos + 1:pos + 2] not in ('/', '*'):
+            regex_allowed = (prev is None or (prev[0] == 'punct' and prev[1] not in ')]')
+                             or (prev[0] == 'name' and prev[1] in _JS_REGEX_KEYWORDS))
+            m = _JS_REGEX.match(text, pos) if regex_allowed else None
+            if m:
+                pos = m.end()
+                prev = ('regex', None)
+                continue
+        m = _JS_TOKEN.match(text, pos)
+        kind = m.lastgroup
+        if kind != 'skip':
+            prev = (kind, m.group())
+            yield kind, prev[1], pos
+        pos = m.end()
+
+def _js_statement(text, pos, found):
+    # Reads the statement that starts with the keyword at pos, adds the module it
+    # names to found, and returns where to resume skipping
+    m = _JS_STATEMENT.match(text, pos)
+    if m:
+        found.append(m.group(m.lastgroup)[1:-1])
+        return m.end()
+    m = _JS_LOCAL_EXPORT.match(text, pos)
+    if m:
+        return m.end()
+    tokens = _js_tokens(text, pos)
+    _, keyword, _ = next(tokens)
+    first = True
+    previous = None
+    for kind, value, start in tokens:
+        if first:
+            first = False
+            if value == '(' and keyword != 'export':
+                # require('x'), import('x')
+                kind, value, start = next(tokens, (None, None, len(text)))
+                if kind == 'str':
+                    found.append(value[1:-1])
+                    return start + len(value)
+                return start
+            if keyword == 'require':
+                return start
+            if kind == 'str' and keyword == 'import':
+                found.append(value[1:-1]) # import 'side-effect'
+                return start + len(value)
+        if kind == 'str' and previous == ('name', 'from'):
+            found.append(value[1:-1])
+            return start + len(value)
+        if ((kind == 'name' and value in ('import', 'export', 'require')) or
+                (kind == 'punct' and value in _JS_STATEMENT_END) or
+                # After 'import {...}' or 'export {...}' only from '...' can follow
+                (previous == ('punct', '}') and value != 'from')):
+            return start
+        previous = (kind, value)
+    return len(text)
+
+# With workers, files go to the pool in batches of up to BATCH_FILES files or
+# BATCH_BYTES of source, so each task outweighs its pickling round trip
+BATCH_FILES = 64
+BATCH_BYTES = 4 * 2**20
+
+def extract_batch(jobs):
+    # Runs in a worker process: extract_dependencies over a list of (ext, content)
+    return [extract_dependencies(ext, content) for ext, content in jobs]
+
+class DependencyExtractor:
+    """
+    Dependency extraction memoized by content digest, so identical files (across
+    directories or environments) are parsed once. With workers > 1, crawls hand
+    files over in batches with submit() and parsing runs in a process pool
+    instead of on the crawl threads.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.pooled = bool(workers and workers > 1)
+        self._results = {} # (language, content_hash) -> tuple of dependencies
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def extract(self, ext, content_hash, content):
+        """Dependencies of one file, parsed in this process."""
+        lang = LANGUAGES.get(ext.lower())
+        if lang is None or not content:
+            return []
+        key = (lang, content_hash)
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None:
+            return list(cached)
+
+        dependencies = extract_dependencies(ext, content)
+        with self._lock:
+            self._results[key] = tuple(dependencies)
+        return dependencies
+
+    def submit(self, jobs):
+        """
+        Start parsing jobs, a list of (ext, content_hash, content), as one task in
+        the process pool. Returns a function that waits for it and returns the
+        dependencies of each job, in order. Known digests are not sent.
+        """
+        keys = [(LANGUAGES.get(ext.lower()), content_hash) for ext, content_hash, _ in jobs]
+        with self._lock:
+            known = {key: self._results[key] for key in keys if key in self._results}
+        todo = {}
+        for key, (ext, _, content) in zip(keys, jobs):
+            if key[0] and content and key not in known:
+                todo.setdefault(key, (ext, content))
+        future = self._executor().submit(extract_batch, list(todo.values())) if todo else None
+
+        def result():
+            if future:
+                parsed = {key: tuple(dependencies) for key, dependencies in zip(todo, future.result())}
+                with self._lock:
+                    self._results.update(parsed)
+                known.update(parsed)
+            return [list(known.get(key, ())) for key in keys]
+        return result
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: the crawl threads are already running, and forking a
+                # threaded process is unsafe (and unavailable on Windows anyway)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def close(self):
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
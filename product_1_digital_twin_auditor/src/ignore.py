@@ -0,0 +1,130 @@
+import re
+
+class IgnoreRule:
+    def __init__(self, pattern, negated, dir_only, regex):
+        self.pattern = pattern # As written, including any '!' and trailing '/'
+        self.negated = negated # '!pattern' re-includes what an earlier rule excluded
+        self.dir_only = dir_only # 'pattern/' only matches directories
+        self.regex = regex
+
+class IgnoreRules:
+    """
+    .gitignore-style include/exclude rules, compiled into a single regex.
+    The last matching rule wins, as in git. Paths are relative to the crawl
+    root and '/'-separated.
+    """
+    def __init__(self, lines=()):
+        self.rules = []
+        for line in lines:
+            rule = self._parse(line)
+            if rule:
+                self.rules.append(rule)
+        # One alternation per kind of entry, newest rule first: the first
+        # alternative that matches is the rule git would apply.
+        self._dir_regex = self._compile(self.rules)
+        self._file_regex = self._compile([rule for rule in self.rules if not rule.dir_only])
+
+    @classmethod
+    def from_sources(cls, path=None, excludes=(), includes=()):
+        """Rules from an ignore file, then --exclude patterns, then --include patterns as '!' rules."""
+        lines = []
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines.extend(f.read().splitlines())
+        lines.extend(excludes)
+        lines.extend('!' + pattern for pattern in includes)
+        return cls(lines)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, rel_path, is_dir):
+        """The rule deciding rel_path, or None when no rule matches."""
+        regex = self._dir_regex if is_dir else self._file_regex
+        m = regex.fullmatch(rel_path) if regex else None
+        return self.rules[int(m.lastgroup[1:])] if m else None
+
+    def excluded_by(self, rel_path, is_dir):
+        """
+        The rule excluding rel_path or one of its parent directories, or None.
+        For paths that do not come from a pruned walk (archive members, watch events).
+        """
+        parts = rel_path.split('/')
+        for i in range(1, len(parts) + 1):
+            rule = self.match('/'.join(parts[:i]), is_dir or i < len(parts))
+            if rule is not None and not rule.negated:
+                return rule
+        return None
+
+    def _compile(self, rules):
+        if not rules:
+            return None
+        index = {id(rule): i for i, rule in enumerate(self.rules)}
+        return re.compile('|'.join(f'(?P<r{index[id(rule)]}>{rule.regex})' for rule in reversed(rules)))
+
+    def _parse(self, line):
+        line = line.rstrip('\n\r')
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        if not line or line.startswith('#'):
+            return None
+
+        pattern = line
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:] # '\#' and '\!' match literally
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+
+        # A slash anywhere but the end anchors the pattern to the crawl root;
+        # otherwise it matches a name at any depth.
+        anchored = '/' in line
+        line = line.lstrip('/')
+        regex = _translate(line)
+        if not anchored and not line.startswith('**'):
+            regex = '(?:.*/)?' + regex
+        return IgnoreRule(pattern, negated, dir_only, regex)
+
+def _translate(glob):
+    # Glob to regex: '*' and '?' stay within one path segment, '**' spans segments
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith('**/', i) and (i == 0 or glob[i - 1] == '/'):
+            out.append('(?:.*/)?')
+            i += 3
+        elif glob.startswith('**', i) and i + 2 == n and (i == 0 or glob[i - 1] == '/'):
+            out.append('.*')
+            i += 2
+        elif c == '*':
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            j = glob.find(']', i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = glob[i + 1:j]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append('[' + body.replace('\\', '\\\\') + ']')
+            i = j + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
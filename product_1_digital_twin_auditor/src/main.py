@@ -2,52 +2,257 @@ import argparse
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add current directory to path so imports work
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.crawler import Crawler
-from src.analyzer import Analyzer
+from src.crawler import Crawler, prefetch
+from src.cache import HashCache, ResponseCache
+from src.dependencies import DependencyExtractor
+from src.ignore import IgnoreRules
+from src.snapshot import SnapshotWriter
+from src.agent import Agent, make_server
+from src.watcher import Watcher
+from src.analyzer import Analyzer, MatrixAnalyzer
 from src.reporter import Reporter
 
 def main():
     parser = argparse.ArgumentParser(description="Launch Risk Intelligence - Digital Twin Pre-Migration Auditor")
-    parser.add_argument('--source', required=True, help="Source environment (URL or Directory Path)")
-    parser.add_argument('--target', required=True, help="Target environment (URL or Directory Path)")
+    parser.add_argument('--source', help="Source environment (URL, Directory Path, .zip/.jar/.war/.tar.gz archive, snapshot file or agent://host:port)")
+    parser.add_argument('--target', help="Target environment (URL, Directory Path, .zip/.jar/.war/.tar.gz archive, snapshot file or agent://host:port)")
+    parser.add_argument('--export-snapshot', help="Save the source crawl as a snapshot file; without --target, only the export is done")
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=URI', help="Compare N environments in one drift matrix (repeat; the first is the baseline)")
     parser.add_argument('--output', default='audit_report.json', help="Output JSON report file path")
+    parser.add_argument('--cache', help="Hash cache file (SQLite); unchanged files are not re-read on later runs")
+    parser.add_argument('--http-cache', help="Response cache file (SQLite); URL re-crawls send conditional requests")
+    parser.add_argument('--workers', type=int, help="Worker threads per crawl (default: serial for directories, 8 for URLs)")
+    parser.add_argument('--dep-workers', type=int, help="Processes for parsing .py/.js/.ts imports, sent files in batches "
+                        "(default: parse on the crawl threads)")
+    parser.add_argument('--ignore-file', help="Directory crawls: skip paths matching this .gitignore-style file")
+    parser.add_argument('--exclude', action='append', default=[], help="Directory crawls: skip paths matching this .gitignore-style pattern (repeatable)")
+    parser.add_argument('--include', action='append', default=[], help="Directory crawls: re-include paths an earlier rule excluded, like '!pattern' (repeatable)")
+    parser.add_argument('--archive-depth', type=int, default=1, help="Archive sources: levels of nested archives (e.g. jars in a war) to open; 0 compares them as whole files")
+    parser.add_argument('--stream', action='store_true', help="Crawl both sides concurrently in sorted order and compare as assets arrive")
+    parser.add_argument('--watch', action='store_true', help="Directory sources: keep running and report drift as files change")
+    parser.add_argument('--watch-interval', type=float, default=2.0, help="Watch mode: seconds between change scans")
+    parser.add_argument('--compact', action='store_true', help="Directory crawls: keep assets in a compact columnar manifest (for very large trees)")
+    parser.add_argument('--staged', action='store_true', help="Directory crawls: compare large files by size, then head/tail samples, then full digest")
+    parser.add_argument('--similar-renames', action='store_true', help="Also pair moved text files whose content changed slightly (same file name, >= 90%% similar)")
+    parser.add_argument('--max-depth', type=int, default=3, help="URL crawls: maximum link depth from the start page")
+    parser.add_argument('--max-pages', type=int, default=500, help="URL crawls: maximum pages fetched per environment")
+    parser.add_argument('--serve-agent', action='store_true', help="Crawl --source and serve it to remote audits as an agent instead of auditing")
+    parser.add_argument('--bind', default='127.0.0.1', help="Agent mode: address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Agent mode: port to listen on (0 picks a free port)")
+    parser.add_argument('--agent-token', help="Shared secret required by agents and sent to agent:// sources")
     
     args = parser.parse_args()
+    if args.env:
+        if len(args.env) < 2 or any('=' not in env for env in args.env):
+            parser.error("--env needs at least two NAME=URI values")
+    elif not args.source:
+        parser.error("--source is required")
+    elif not args.target and not args.export_snapshot and not args.serve_agent:
+        parser.error("--target is required unless --export-snapshot or --serve-agent is given")
+    elif args.watch and not (os.path.isdir(args.source) and args.target and os.path.isdir(args.target)):
+        parser.error("--watch needs a source and a target directory")
+    elif args.watch and (args.stream or args.compact or args.staged or args.export_snapshot):
+        parser.error("--watch cannot be combined with --stream, --compact, --staged or --export-snapshot")
 
-    print(f"Starting Audit...")
+    # One response cache serves both crawls; entries are keyed by full URL
+    http_cache = ResponseCache(args.http_cache) if args.http_cache else None
+    # One hash cache serves every crawler; each prunes only entries under its own root
+    cache = HashCache(args.cache) if args.cache else None
+    # Shared so a file present in both environments is parsed once
+    extractor = DependencyExtractor(workers=args.dep_workers)
+    ignore = IgnoreRules.from_sources(args.ignore_file, args.exclude, args.include)
+
+    def make_crawler(uri):
+        return Crawler(
+            uri,
+            workers=args.workers,
+            cache=cache,
+            http_cache=http_cache,
+            max_depth=args.max_depth,
+            max_pages=args.max_pages,
+            compact=args.compact,
+            staged=args.staged,
+            extractor=extractor,
+            ignore=ignore,
+            archive_depth=args.archive_depth,
+            agent_token=args.agent_token
+        )
+
+    def close_shared():
+        extractor.close()
+        for shared in (cache, http_cache):
+            if shared:
+                shared.close()
+
+    if args.env:
+        run_matrix(args, make_crawler)
+        close_shared()
+        return
+
+    if args.serve_agent:
+        agent = Agent(lambda: make_crawler(args.source), token=args.agent_token)
+        agent.refresh()
+        server = make_server(agent, args.bind, args.port)
+        host, port = server.server_address[:2]
+        print(f"Agent for {args.source} listening on agent://{host}:{port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            close_shared()
+        return
+
+    print(f"Starting Audit..." if args.target else "Starting Snapshot Export...")
     print(f"Source: {args.source}")
-    print(f"Target: {args.target}")
+    if args.target:
+        print(f"Target: {args.target}")
 
-    # Crawl Source
-    print("\nCrawling Source Environment...")
-    source_crawler = Crawler(args.source)
-    source_assets = source_crawler.crawl()
-    print(f"Found {len(source_assets)} assets in Source.")
+    source_crawler = make_crawler(args.source)
+    snapshot = SnapshotWriter(args.export_snapshot, args.source) if args.export_snapshot else None
 
-    # Crawl Target
-    print("\nCrawling Target Environment...")
-    target_crawler = Crawler(args.target)
-    target_assets = target_crawler.crawl()
-    print(f"Found {len(target_assets)} assets in Target.")
+    if not args.target:
+        # Export only: stream the crawl straight into the snapshot
+        for _ in snapshot.tee(source_crawler.iter_assets()):
+            pass
+        snapshot.close()
+        close_shared()
+        print(f"Snapshot of {snapshot.count} assets saved to: {args.export_snapshot}")
+        return
+
+    target_crawler = make_crawler(args.target)
+
+    if args.watch:
+        run_watch(args, source_crawler, target_crawler)
+        close_shared()
+        return
+
+    if args.stream:
+        # Pipelined crawl-and-compare: findings are printed as soon as they are found
+        print("\nCrawling and Analyzing (streaming)...")
+
+        def print_issue(issue):
+            print(f"  [{issue['type']}] {issue['path']}")
+
+        analyzer = Analyzer({}, {}, similar_renames=args.similar_renames)
+        report_data = analyzer.analyze_stream(
+            prefetch(snapshot.tee(source_crawler.iter_assets()) if snapshot else source_crawler.iter_assets()),
+            prefetch(target_crawler.iter_assets()),
+            on_issue=print_issue
+        )
+    else:
+        # Crawl Source and Target concurrently
+        print("\nCrawling Source and Target Environments...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source_future = executor.submit(source_crawler.crawl)
+            target_future = executor.submit(target_crawler.crawl)
+            source_assets = source_future.result()
+            target_assets = target_future.result()
+        if snapshot:
+            for path in sorted(source_assets):
+                snapshot.write(source_assets[path])
+        print(f"Found {len(source_assets)} assets in Source.")
+        print(f"Found {len(target_assets)} assets in Target.")
+
+        # Analyze
+        print("\nAnalyzing Differences...")
+        analyzer = Analyzer(source_assets, target_assets, source_crawler.tree, target_crawler.tree,
+                            similar_renames=args.similar_renames)
+        report_data = analyzer.analyze()
+    close_shared()
+    if snapshot:
+        snapshot.close()
+        print(f"Source snapshot saved to: {args.export_snapshot}")
 
-    # Analyze
-    print("\nAnalyzing Differences...")
-    analyzer = Analyzer(source_assets, target_assets)
-    report_data = analyzer.analyze()
     report_data['meta'] = {
         'timestamp': time.time(),
         'source': args.source,
         'target': args.target
     }
+    if ignore:
+        report_data['meta']['ignored'] = {
+            'source': source_crawler.ignore_stats,
+            'target': target_crawler.ignore_stats
+        }
+        print("\nIgnored by rules (files / bytes / pruned dirs):")
+        for pattern in sorted(set(source_crawler.ignore_stats) | set(target_crawler.ignore_stats)):
+            for side, crawler in (('source', source_crawler), ('target', target_crawler)):
+                stats = crawler.ignore_stats.get(pattern)
+                if stats:
+                    print(f"  {pattern:<30} {side}: {stats['files']} / {stats['bytes']} / {stats['dirs']}")
 
     # Report
     reporter = Reporter(report_data)
     reporter.generate_console_report()
     reporter.export_json(args.output)
 
+def run_watch(args, source_crawler, target_crawler):
+    watcher = Watcher(source_crawler, target_crawler)
+    print("\nCrawling and Analyzing (initial)...")
+    report_data = watcher.start()
+
+    def save(report_data):
+        report_data['meta'] = {
+            'timestamp': time.time(),
+            'source': args.source,
+            'target': args.target
+        }
+        Reporter(report_data).export_json(args.output)
+
+    Reporter(report_data).generate_console_report()
+    save(report_data)
+    method = "file system events" if watcher.use_events else "stat scans"
+    print(f"\nWatching for changes ({method} every {args.watch_interval}s). Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+            delta = watcher.poll()
+            if not delta['introduced'] and not delta['resolved']:
+                continue
+            print(f"\n[{time.strftime('%H:%M:%S')}] {len(delta['changed_paths'])} changed path(s)")
+            for issue in delta['introduced']:
+                print(f"  + [{issue['type']}] {issue['path']}")
+            for issue in delta['resolved']:
+                print(f"  - [{issue['type']}] {issue['path']} (resolved)")
+            save(watcher.report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+def run_matrix(args, make_crawler):
+    environments = [env.split('=', 1) for env in args.env]
+    print(f"Starting Matrix Audit...")
+    for name, uri in environments:
+        print(f"{name}: {uri}")
+
+    # Each environment is crawled and hashed once, all at the same time
+    print(f"\nCrawling {len(environments)} Environments...")
+    crawlers = [make_crawler(uri) for _, uri in environments]
+    with ThreadPoolExecutor(max_workers=len(crawlers)) as executor:
+        results = list(executor.map(lambda crawler: crawler.crawl(), crawlers))
+    for (name, _), assets in zip(environments, results):
+        print(f"Found {len(assets)} assets in {name}.")
+
+    print("\nAnalyzing Differences...")
+    analyzer = MatrixAnalyzer([(name, assets, crawler.tree)
+                               for (name, _), assets, crawler in zip(environments, results, crawlers)])
+    report_data = analyzer.analyze()
+    report_data['meta'] = {
+        'timestamp': time.time(),
+        'environments': dict(environments)
+    }
+
+    reporter = Reporter(report_data)
+    reporter.generate_matrix_report()
+    reporter.export_json(args.output)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,178 @@
+import os
+import sys
+from array import array
+from .crawler import Asset
+
+DIGEST_SIZE = 32 # raw SHA-256
+
+# Row flags
+HAS_DIGEST = 1
+DEFERRED = 2 # staged crawl: digest is computed on demand from the file
+
+# Metadata keys stored in their own columns; everything else goes to the interned extras table
+COLUMN_KEYS = {'size', 'permissions', 'mtime'}
+
+class AssetManifest:
+    """
+    Compact, array-backed store of crawled file assets.
+    Behaves like the Crawler's {path: Asset} dict (Asset objects are built on access),
+    but keeps one row per file in typed columns instead of a Python object per file.
+    """
+
+    def __init__(self, root=None):
+        self.root = root # Used to rebuild Asset.file_path for on-demand content
+        self.dirs = [] # dir id -> directory path ('' for the root)
+        self.dir_ids = {}
+        self.row_dirs = array('I') # row -> dir id
+        self.names = [] # row -> file name
+        self.sizes = array('q')
+        self.modes = array('H') # permission bits
+        self.mtimes = array('d')
+        self.digests = bytearray() # DIGEST_SIZE bytes per row
+        self.flags = bytearray()
+        self.canonicals = {} # row -> raw canonical digest (only normalizable files have one)
+        self.extra_ids = array('I') # row -> index into self.extras (0: no extra metadata)
+        self.extras = [None]
+        self._extra_keys = {}
+        self._index = None # path -> row, built only if random access is needed
+        self.is_sorted = True # rows appended in path order (the crawler walk guarantees this)
+        self._last_path = None
+
+    # Mapping interface
+
+    def __setitem__(self, path, asset):
+        self.append(asset)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return (self.path(row) for row in range(len(self)))
+
+    def __contains__(self, path):
+        return self._row(path) is not None
+
+    def __getitem__(self, path):
+        row = self._row(path)
+        if row is None:
+            raise KeyError(path)
+        return self.asset(row)
+
+    def get(self, path, default=None):
+        row = self._row(path)
+        return default if row is None else self.asset(row)
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return (self.asset(row) for row in range(len(self)))
+
+    def items(self):
+        return ((self.path(row), self.asset(row)) for row in range(len(self)))
+
+    # Columns
+
+    def append(self, asset):
+        directory, _, name = asset.path.rpartition('/')
+        dir_id = self.dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self.dir_ids[directory] = len(self.dirs)
+            self.dirs.append(sys.intern(directory))
+
+        metadata = asset.metadata
+        flags = 0
+        if asset.hash_deferred:
+            self.digests += bytes(DIGEST_SIZE)
+            flags |= DEFERRED
+        elif asset.content_hash:
+            self.digests += bytes.fromhex(asset.content_hash)
+            flags |= HAS_DIGEST
+        else:
+            self.digests += bytes(DIGEST_SIZE)
+
+        if asset.canonical_hash:
+            self.canonicals[len(self.names)] = bytes.fromhex(asset.canonical_hash)
+
+        self.row_dirs.append(dir_id)
+        self.names.append(name)
+        self.sizes.append(metadata.get('size', -1))
+        self.modes.append(int(metadata.get('permissions', '0'), 8))
+        self.mtimes.append(metadata.get('mtime', 0.0))
+        self.flags.append(flags)
+        self.extra_ids.append(self._intern_extra(metadata))
+
+        if self._index is not None:
+            self._index[asset.path] = len(self) - 1
+        if self._last_path is not None and asset.path < self._last_path:
+            self.is_sorted = False
+        self._last_path = asset.path
+
+    def path(self, row):
+        directory = self.dirs[self.row_dirs[row]]
+        return f"{directory}/{self.names[row]}" if directory else self.names[row]
+
+    def digest(self, row):
+        if not self.flags[row] & HAS_DIGEST:
+            return None
+        return bytes(self.digests[row * DIGEST_SIZE:(row + 1) * DIGEST_SIZE])
+
+    def metadata(self, row):
+        extra = self.extras[self.extra_ids[row]]
+        if extra and 'error' in extra:
+            return dict(extra)
+        metadata = {
+            'size': self.sizes[row],
+            'permissions': format(self.modes[row], '03o'),
+            'mtime': self.mtimes[row]
+        }
+        if extra:
+            metadata.update(extra)
+            if 'dependencies' in metadata:
+                metadata['dependencies'] = list(metadata['dependencies'])
+        return metadata
+
+    def asset(self, row):
+        path = self.path(row)
+        digest = self.digest(row)
+        deferred = bool(self.flags[row] & DEFERRED)
+        file_path = os.path.join(self.root, path) if self.root and (digest or deferred) else None
+        canonical = self.canonicals.get(row)
+        return Asset(path, 'file', metadata=self.metadata(row), file_path=file_path,
+                     content_hash=digest.hex() if digest else None, defer_hash=deferred,
+                     canonical_hash=canonical.hex() if canonical else None)
+
+    def same_row(self, row, other, other_row):
+        """True when two rows would produce no issue: equal digests and non-volatile metadata."""
+        if not (self.flags[row] & other.flags[other_row] & HAS_DIGEST):
+            return False
+        start, other_start = row * DIGEST_SIZE, other_row * DIGEST_SIZE
+        return (
+            self.digests[start:start + DIGEST_SIZE] == other.digests[other_start:other_start + DIGEST_SIZE]
+            and self.sizes[row] == other.sizes[other_row]
+            and self.modes[row] == other.modes[other_row]
+            and self.extras[self.extra_ids[row]] == other.extras[other.extra_ids[other_row]]
+        )
+
+    def sorted_rows(self):
+        """Row numbers in path order."""
+        if self.is_sorted:
+            return range(len(self))
+        return sorted(range(len(self)), key=self.path)
+
+    def _intern_extra(self, metadata):
+        # Identical extra metadata (shadow IT flags, dependency lists, errors) is stored once
+        extra = {k: tuple(v) if isinstance(v, list) else v for k, v in metadata.items() if k not in COLUMN_KEYS}
+        if not extra:
+            return 0
+        key = tuple(sorted(extra.items()))
+        extra_id = self._extra_keys.get(key)
+        if extra_id is None:
+            extra_id = self._extra_keys[key] = len(self.extras)
+            self.extras.append(extra)
+        return extra_id
+
+    def _row(self, path):
+        if self._index is None:
+            self._index = {self.path(row): row for row in range(len(self))}
+        return self._index.get(path)
@@ -0,0 +1,106 @@
+import os
+import hashlib
+import json
+
+# Metadata fields that change on every deploy and are ignored when comparing assets
+# (mtime for files; Date, Last-Modified and Etag HTTP headers)
+VOLATILE_METADATA = ('mtime', 'Date', 'Last-Modified', 'Etag')
+
+# Per-response HTTP headers ignored inside metadata['headers'] (compared lower-cased)
+VOLATILE_HEADERS = {'date', 'last-modified', 'etag', 'age', 'expires', 'set-cookie'}
+
+def clean_metadata(metadata):
+    # Remove volatile fields
+    clean = metadata.copy()
+    for key in VOLATILE_METADATA:
+        clean.pop(key, None)
+    if isinstance(clean.get('headers'), dict):
+        clean['headers'] = {k: v for k, v in clean['headers'].items() if k.lower() not in VOLATILE_HEADERS}
+    return clean
+
+class MerkleTree:
+    """
+    Directory digests for a crawled file tree.
+    A directory's digest covers the names, content hashes and non-volatile metadata of
+    everything below it, so two directories with equal digests produce no audit issues.
+    """
+
+    def __init__(self):
+        self.leaves = {} # file path -> digest (None for assets that can never match, e.g. crawl errors)
+        self.children = {'': {}} # dir path ('' is the root) -> {name: is_dir}
+        self.digests = {} # dir path -> digest, filled by finalize()
+
+    def add(self, asset):
+        self.leaves[asset.path] = self._leaf_digest(asset)
+        parts = asset.path.split('/')
+        parent = ''
+        for i, name in enumerate(parts):
+            is_dir = i < len(parts) - 1
+            self.children[parent][name] = is_dir
+            if not is_dir:
+                break
+            parent = f"{parent}/{name}" if parent else name
+            self.children.setdefault(parent, {})
+
+    def finalize(self):
+        # Children are hashed before their parents: deepest directories first
+        for directory in sorted(self.children, key=lambda d: d.count('/') + bool(d), reverse=True):
+            digest = hashlib.sha256()
+            for name in sorted(self.children[directory]):
+                path = self._join(directory, name)
+                if self.children[directory][name]:
+                    child = self.digests[path]
+                else:
+                    # A random token for errored assets keeps their directory from ever matching
+                    child = self.leaves[path] or os.urandom(16).hex()
+                digest.update(f"{name}\0{'d' if self.children[directory][name] else 'f'}\0{child}\n".encode('utf-8'))
+            self.digests[directory] = digest.hexdigest()
+        return self
+
+    def diff_paths(self, other):
+        """Return the file paths that may differ between the two trees, skipping identical subtrees."""
+        paths = []
+        stack = ['']
+        while stack:
+            directory = stack.pop()
+            if self.digests.get(directory) == other.digests.get(directory):
+                continue
+            mine = self.children.get(directory, {})
+            theirs = other.children.get(directory, {})
+            for name in set(mine) | set(theirs):
+                path = self._join(directory, name)
+                if name in mine and name in theirs and mine[name] == theirs[name]:
+                    if mine[name]:
+                        stack.append(path)
+                    elif self.leaves[path] is None or self.leaves[path] != other.leaves[path]:
+                        paths.append(path)
+                else:
+                    # Present on one side only (or file on one side, directory on the other)
+                    for tree, kinds in ((self, mine), (other, theirs)):
+                        if name not in kinds:
+                            continue
+                        if kinds[name]:
+                            paths.extend(tree.files_under(path))
+                        else:
+                            paths.append(path)
+        return set(paths)
+
+    def files_under(self, directory):
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            for name, is_dir in self.children.get(current, {}).items():
+                path = self._join(current, name)
+                if is_dir:
+                    stack.append(path)
+                else:
+                    yield path
+
+    def _leaf_digest(self, asset):
+        if asset.content_hash is None or 'error' in asset.metadata:
+            return None
+        meta = json.dumps(clean_metadata(asset.metadata), sort_keys=True, default=str)
+        return hashlib.sha256(f"{asset.content_hash}\0{meta}".encode('utf-8')).hexdigest()
+
+    def _join(self, directory, name):
+        return f"{directory}/{name}" if directory else name
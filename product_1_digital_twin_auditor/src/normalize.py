@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import configparser
+try:
+    import yaml
+except ImportError:
+    yaml = None
+from .structdiff import JSON_EXTS, YAML_EXTS
+
+# Files larger than this get no canonical digest (they would have to be parsed in memory)
+CANONICAL_MAX_SIZE = 1024 * 1024
+
+INI_EXTS = {'.ini', '.cfg'}
+# Text formats where line endings and trailing whitespace carry no meaning.
+# Shell scripts are deliberately absent: CRLF breaks them.
+TEXT_EXTS = {'.txt', '.md', '.csv', '.html', '.htm', '.xml', '.css', '.svg'}
+
+def canonical_kind(path):
+    """Which normalizer applies to path, or None."""
+    name = os.path.basename(path).lower()
+    _, ext = os.path.splitext(name)
+    if ext in JSON_EXTS:
+        return 'json'
+    if ext in YAML_EXTS:
+        return 'yaml' if yaml else None
+    if name == '.env' or name.startswith('.env.') or ext == '.env':
+        return 'env'
+    if ext in INI_EXTS:
+        return 'ini'
+    if ext in TEXT_EXTS:
+        return 'text'
+    return None
+
+def canonical_digest(kind, content):
+    """
+    SHA-256 of the normalized form of content. Two files with equal canonical digests
+    differ only cosmetically (key order, whitespace, line endings).
+    """
+    text = content.decode('utf-8-sig', errors='replace')
+    try:
+        normalized = NORMALIZERS[kind](text)
+    except Exception:
+        # Unparseable as its declared type; fall back to whitespace-only normalization
+        kind, normalized = 'text', _normalize_text(text)
+    return hashlib.sha256(f"{kind}\0{normalized}".encode('utf-8')).hexdigest()
+
+def _normalize_text(text):
+    lines = [line.rstrip() for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n')]
+    while lines and not lines[-1]:
+        lines.pop()
+    return '\n'.join(lines)
+
+def _normalize_json(text):
+    return json.dumps(json.loads(text), sort_keys=True, separators=(',', ':'))
+
+def _normalize_yaml(text):
+    return json.dumps(list(yaml.safe_load_all(text)), sort_keys=True, separators=(',', ':'), default=str)
+
+def _normalize_env(text):
+    # Only the effective assignments matter: a key assigned twice keeps its last
+    # value, as dotenv and shells do. Values keep their quotes: '$HOME' is
+    # literal while "$HOME" and $HOME expand.
+    entries = {}
+    for line in _normalize_text(text).split('\n'):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('export '):
+            line = line[len('export '):].lstrip()
+        key, sep, value = line.partition('=')
+        entries[key.strip()] = f"{key.strip()}{sep}{value.strip()}"
+    return '\n'.join(entries[key] for key in sorted(entries))
+
+def _normalize_ini(text):
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str # keys are case-sensitive for most consumers
+    parser.read_string(text)
+    sections = {
+        name: dict(sorted((k, v.strip()) for k, v in parser.items(name, raw=True)))
+        for name in parser.sections()
+    }
+    sections['DEFAULT'] = dict(sorted(parser.defaults().items()))
+    return json.dumps(sections, sort_keys=True, separators=(',', ':'))
+
+NORMALIZERS = {
+    'json': _normalize_json,
+    'yaml': _normalize_yaml,
+    'env': _normalize_env,
+    'ini': _normalize_ini,
+    'text': _normalize_text
+}
@@ -17,6 +17,8 @@ class Reporter:
         print(f"  Missing Assets:     {summary['missing']}")
         print(f"  New Assets:         {summary['new']}")
         print(f"  Modified Assets:    {summary['modified']}")
+        print(f"  Renamed/Moved:      {summary.get('renamed', 0)}")
+        print(f"  Cosmetic Only:      {summary.get('cosmetic', 0)}")
         print(f"  Config Drift:       {summary['metadata_mismatch']}")
         print(f"  Errors:             {summary['errors']}")
         print("-" * 60)
@@ -50,6 +52,45 @@ class Reporter:
         print("END OF REPORT")
         print("="*60 + "\n")
 
+    def generate_matrix_report(self, max_rows=200):
+        """Console view of a MatrixAnalyzer report: one line per drifting path."""
+        names = self.report_data['environments']
+        summary = self.report_data['summary']
+        rows = self.report_data['matrix']
+
+        print("\n" + "="*60)
+        print("LAUNCH RISK INTELLIGENCE: ENVIRONMENT DRIFT MATRIX")
+        print("="*60 + "\n")
+
+        print("SUMMARY:")
+        print(f"  Drifting Paths:     {summary['paths']}")
+        print(f"  Missing Somewhere:  {summary['missing']}")
+        print(f"  Modified:           {summary['modified']}")
+        print(f"  Cosmetic Only:      {summary['cosmetic']}")
+        print(f"  Config Drift:       {summary['metadata_mismatch']}")
+        print(f"  Errors:             {summary['errors']}")
+        for name, count in summary['drift_from_baseline'].items():
+            print(f"  {name} vs {names[0]}: {count} paths differ")
+        print("-" * 60)
+
+        if not rows:
+            print("\n[OK] ALL ENVIRONMENTS MATCH.")
+        else:
+            width = min(max(len(row['path']) for row in rows), 60)
+            columns = [max(len(name), 3) for name in names]
+            print("\n" + "PATH".ljust(width) + "  " + "  ".join(n.ljust(c) for n, c in zip(names, columns)) + "  CLASS")
+            for row in rows[:max_rows]:
+                path = row['path'] if len(row['path']) <= width else '...' + row['path'][-(width - 3):]
+                cells = "  ".join(row['cells'][n].ljust(c) for n, c in zip(names, columns))
+                print(f"{path.ljust(width)}  {cells}  {row['class']}")
+            if len(rows) > max_rows:
+                print(f"... {len(rows) - max_rows} more rows in the JSON report")
+            print("\nA, B, ...: distinct contents (A = first environment's)   -: absent   !: crawl error   *: metadata drift")
+
+        print("\n" + "="*60)
+        print("END OF REPORT")
+        print("="*60 + "\n")
+
     def export_json(self, filepath):
         with open(filepath, 'w') as f:
             json.dump(self.report_data, f, indent=2)
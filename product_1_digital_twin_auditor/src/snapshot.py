@@ -0,0 +1,94 @@
+import gzip
+import json
+import time
+import logging
+from .crawler import Asset
+from .merkle import MerkleTree, clean_metadata
+
+logger = logging.getLogger(__name__)
+
+# A snapshot is a gzipped JSON-lines file: one header line, then one line per
+# asset in sorted path order. Readers refuse snapshots with a newer version.
+SNAPSHOT_FORMAT = 'twin-snapshot'
+SNAPSHOT_VERSION = 1
+
+def asset_record(asset):
+    """JSON-ready record of an asset: path, digests and cleaned metadata (no content)."""
+    record = {'path': asset.path, 'type': asset.asset_type, 'hash': asset.content_hash}
+    if asset.canonical_hash:
+        record['canonical'] = asset.canonical_hash
+    # Volatile fields (mtime, Date, ...) are never compared, so they are not stored
+    record['meta'] = clean_metadata(asset.metadata)
+    return record
+
+def record_asset(record, loader=None):
+    """Asset from a record; without a loader it is digest-only and has no content to diff."""
+    return Asset(record['path'], record['type'], metadata=record['meta'], content_hash=record['hash'],
+                 canonical_hash=record.get('canonical'), loader=loader)
+
+def is_snapshot(path):
+    """True if path is a snapshot file (checked by content, not by name)."""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline(4096))
+    except (OSError, EOFError, ValueError, UnicodeDecodeError):
+        return False
+    return isinstance(header, dict) and header.get('format') == SNAPSHOT_FORMAT
+
+class SnapshotWriter:
+    """Writes assets to a snapshot as they are produced (assets must arrive in sorted path order)."""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.count = 0
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._write({
+            'format': SNAPSHOT_FORMAT,
+            'version': SNAPSHOT_VERSION,
+            'source': source,
+            'created': time.time()
+        })
+
+    def write(self, asset):
+        self._write(asset_record(asset))
+        self.count += 1
+
+    def tee(self, assets):
+        # Passes assets through unchanged, writing each one on the way
+        for asset in assets:
+            self.write(asset)
+            yield asset
+
+    def close(self):
+        self._file.close()
+        logger.info(f"Wrote {self.count} assets to snapshot {self.path}")
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':'), default=str))
+        self._file.write('\n')
+
+def read_snapshot(path):
+    """Returns (header, iterator of Assets in sorted path order)."""
+    f = gzip.open(path, 'rt', encoding='utf-8')
+    header = json.loads(f.readline())
+    if header.get('format') != SNAPSHOT_FORMAT:
+        f.close()
+        raise ValueError(f"{path} is not a snapshot")
+    if header.get('version', 0) > SNAPSHOT_VERSION:
+        f.close()
+        raise ValueError(f"Snapshot {path} has version {header['version']}; this build reads up to {SNAPSHOT_VERSION}")
+    return header, _iter_assets(f)
+
+def _iter_assets(f):
+    with f:
+        for line in f:
+            yield record_asset(json.loads(line))
+
+def load_snapshot(assets, path):
+    """Fill an assets mapping from a snapshot and return its MerkleTree."""
+    _, records = read_snapshot(path)
+    tree = MerkleTree()
+    for asset in records:
+        assets[asset.path] = asset
+        tree.add(asset)
+    return tree.finalize()
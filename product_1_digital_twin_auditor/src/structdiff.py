@@ -0,0 +1,132 @@
+import os
+import re
+import json
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Budgets for structured diffs
+MAX_DOCUMENT_SIZE = 2 * 1024 * 1024 # larger documents are not parsed
+MAX_DEPTH = 32 # deeper values are compared as a whole
+MAX_CHANGES = 50 # changes listed per asset
+MAX_VALUE_LENGTH = 80 # characters of each old/new value shown
+
+JSON_EXTS = {'.json', '.jsonc', '.map', '.webmanifest'}
+YAML_EXTS = {'.yaml', '.yml'}
+SNIFF_SIZE = 1024
+
+# A YAML document usually starts with '---' or a 'key:' line (after comments)
+YAML_SNIFF = re.compile(rb'^(?:---|[\w.\-"\']+\s*:(?:\s|$))')
+
+def detect_format(path, head):
+    """Pick 'json', 'yaml' or None from the file extension, else by sniffing the first bytes."""
+    _, ext = os.path.splitext(path.lower())
+    if ext in JSON_EXTS:
+        return 'json'
+    if ext in YAML_EXTS:
+        return 'yaml' if yaml else None
+    if ext:
+        # Known non-structured extension (source, markup, binary); don't guess
+        return None
+
+    head = head[:SNIFF_SIZE]
+    if b'\0' in head:
+        return None # binary
+    stripped = head.lstrip(b'\xef\xbb\xbf \t\r\n')
+    if stripped[:1] in (b'{', b'['):
+        return 'json'
+    for line in stripped.splitlines():
+        if line.strip() and not line.lstrip().startswith(b'#'):
+            return 'yaml' if yaml and YAML_SNIFF.match(line) else None
+    return None
+
+def parse(fmt, content):
+    if fmt == 'json':
+        return json.loads(content)
+    if fmt == 'yaml':
+        return yaml.safe_load(content)
+    raise ValueError(f"Unsupported format: {fmt}")
+
+class StructDiff:
+    """Recursive diff of two parsed documents, reported as 'a.b[2].c: old -> new' lines."""
+
+    def __init__(self, max_depth=MAX_DEPTH, max_changes=MAX_CHANGES):
+        self.max_depth = max_depth
+        self.max_changes = max_changes
+        self.changes = []
+        self.truncated = False # stopped at max_changes
+
+    def diff(self, old, new):
+        self._walk(old, new, '', 0)
+        return self
+
+    def render(self):
+        if not self.changes:
+            return "No structural changes (formatting only)"
+        text = '; '.join(self.changes)
+        if self.truncated:
+            text += f"; ... (stopped after {self.max_changes} changes)"
+        return text
+
+    def _walk(self, old, new, path, depth):
+        if old == new and _same(old, new):
+            return
+        if depth >= self.max_depth:
+            self._record(f"{path or '<root>'}: (nested value changed)")
+            return
+
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in sorted(set(old) | set(new), key=str):
+                child = f"{path}.{key}" if path else str(key)
+                if key not in new:
+                    self._record(f"{child}: {self._show(old[key])} -> (removed)")
+                elif key not in old:
+                    self._record(f"{child}: (added) {self._show(new[key])}")
+                else:
+                    self._walk(old[key], new[key], child, depth + 1)
+                if self.truncated:
+                    return
+        elif isinstance(old, list) and isinstance(new, list):
+            for i in range(max(len(old), len(new))):
+                child = f"{path}[{i}]"
+                if i >= len(new):
+                    self._record(f"{child}: {self._show(old[i])} -> (removed)")
+                elif i >= len(old):
+                    self._record(f"{child}: (added) {self._show(new[i])}")
+                else:
+                    self._walk(old[i], new[i], child, depth + 1)
+                if self.truncated:
+                    return
+        elif type(old) is not type(new):
+            self._record(f"{path or '<root>'}: {self._show(old)} -> {self._show(new)} ({_kind(old)} -> {_kind(new)})")
+        else:
+            self._record(f"{path or '<root>'}: {self._show(old)} -> {self._show(new)}")
+
+    def _record(self, change):
+        if len(self.changes) < self.max_changes:
+            self.changes.append(change)
+        else:
+            self.truncated = True
+
+    def _show(self, value):
+        text = json.dumps(value, default=str) if not isinstance(value, str) else value
+        return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH - 3] + '...'
+
+# Type names as the documents spell them
+KINDS = {type(None): 'null', bool: 'boolean', int: 'integer', float: 'float', str: 'string', dict: 'object', list: 'array'}
+
+def _same(old, new):
+    # Equal with the same types throughout: Python has 1 == 1.0 == True, but in
+    # a document 1, 1.0 and true are different values. Called once old == new,
+    # so keys and lengths already match.
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, dict):
+        return all(_same(value, new[key]) for key, value in old.items())
+    if isinstance(old, list):
+        return all(map(_same, old, new))
+    return True
+
+def _kind(value):
+    return KINDS.get(type(value), type(value).__name__)
@@ -0,0 +1,105 @@
+import time
+import difflib
+
+# Budgets for line diffs of modified text assets
+MAX_INPUT_SIZE = 8 * 1024 * 1024 # bytes per side; larger files are not diffed
+MAX_CHANGED_LINES = 5000 # lines per side left after trimming common prefix/suffix
+# Changed lines of one side times the other's. difflib's matching is about
+# quadratic in these on repetitive text (4,990 x 4,990 took 4 s), and runs before
+# TIME_BUDGET is first checked, so larger regions get a summary instead.
+MAX_LINE_PAIRS = 2000 * 2000
+MAX_OUTPUT_LINES = 200
+MAX_OUTPUT_BYTES = 16 * 1024
+TIME_BUDGET = 2.0 # seconds
+CONTEXT_LINES = 3
+
+def is_binary(content):
+    return b'\0' in content[:8192]
+
+def unified_diff(old, new, old_name='source', new_name='target'):
+    """
+    Bounded unified diff of two byte strings. Returns None for binary content.
+    Lines are compared by hash, and the common prefix and suffix are skipped
+    before difflib sees anything, so long mostly-equal files stay cheap.
+    """
+    if is_binary(old) or is_binary(new):
+        return None
+    deadline = time.monotonic() + TIME_BUDGET
+
+    old_lines = old.decode('utf-8', errors='replace').splitlines()
+    new_lines = new.decode('utf-8', errors='replace').splitlines()
+    old_hashes = [hash(line) for line in old_lines]
+    new_hashes = [hash(line) for line in new_lines]
+
+    # Trim the common prefix and suffix
+    prefix = 0
+    limit = min(len(old_hashes), len(new_hashes))
+    while prefix < limit and old_hashes[prefix] == new_hashes[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < limit - prefix and
+           old_hashes[len(old_hashes) - 1 - suffix] == new_hashes[len(new_hashes) - 1 - suffix]):
+        suffix += 1
+
+    if prefix == len(old_hashes) == len(new_hashes):
+        return "Line endings or encoding differ only"
+    old_changed = len(old_hashes) - suffix - prefix
+    new_changed = len(new_hashes) - suffix - prefix
+    if (old_changed > MAX_CHANGED_LINES or new_changed > MAX_CHANGED_LINES or
+            old_changed * new_changed > MAX_LINE_PAIRS):
+        return (f"Changed region too large for a line diff: lines {prefix + 1}-{len(old_hashes) - suffix} "
+                f"in source, {prefix + 1}-{len(new_hashes) - suffix} in target")
+
+    # Keep CONTEXT_LINES of the trimmed prefix/suffix so hunks get their usual context
+    start = max(0, prefix - CONTEXT_LINES)
+    suffix = max(0, suffix - CONTEXT_LINES)
+    matcher = difflib.SequenceMatcher(
+        None, old_hashes[start:len(old_hashes) - suffix], new_hashes[start:len(new_hashes) - suffix], autojunk=False
+    )
+
+    output = [f"--- {old_name}", f"+++ {new_name}"]
+    size = sum(len(line) + 1 for line in output)
+    for group in matcher.get_grouped_opcodes(CONTEXT_LINES):
+        changes = [op for op in group if op[0] != 'equal']
+        old_lo, new_lo = start + changes[0][1], start + changes[0][3]
+        old_hi, new_hi = start + changes[-1][2], start + changes[-1][4]
+
+        # Context is taken from the full files, so it can reach into the trimmed prefix/suffix
+        lead = 0
+        while (lead < CONTEXT_LINES and old_lo - lead > 0 and new_lo - lead > 0 and
+               old_hashes[old_lo - lead - 1] == new_hashes[new_lo - lead - 1]):
+            lead += 1
+        trail = 0
+        while (trail < CONTEXT_LINES and old_hi + trail < len(old_hashes) and new_hi + trail < len(new_hashes) and
+               old_hashes[old_hi + trail] == new_hashes[new_hi + trail]):
+            trail += 1
+
+        hunk = [f"@@ -{_range(old_lo - lead, old_hi + trail)} +{_range(new_lo - lead, new_hi + trail)} @@"]
+        hunk.extend(' ' + line for line in old_lines[old_lo - lead:old_lo])
+        for tag, i1, i2, j1, j2 in group[group.index(changes[0]):group.index(changes[-1]) + 1]:
+            if tag == 'equal':
+                hunk.extend(' ' + line for line in old_lines[start + i1:start + i2])
+                continue
+            hunk.extend('-' + line for line in old_lines[start + i1:start + i2])
+            hunk.extend('+' + line for line in new_lines[start + j1:start + j2])
+        hunk.extend(' ' + line for line in old_lines[old_hi:old_hi + trail])
+
+        for line in hunk:
+            size += len(line) + 1
+            if len(output) >= MAX_OUTPUT_LINES or size > MAX_OUTPUT_BYTES:
+                output.append("... (diff truncated)")
+                return '\n'.join(output)
+            output.append(line)
+        if time.monotonic() > deadline:
+            output.append("... (diff stopped: time budget exceeded)")
+            break
+    return '\n'.join(output)
+
+def _range(start, stop):
+    # Unified diff range: 1-based start, and the length when it is not 1
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
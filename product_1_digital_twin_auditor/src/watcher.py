@@ -0,0 +1,203 @@
+import os
+import time
+import logging
+import threading
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+from .analyzer import Analyzer
+
+logger = logging.getLogger(__name__)
+
+# With file system events, a full stat scan still runs this often as a safety net
+# for dropped events (inotify queue overflow, network mounts)
+FULL_SCAN_SECONDS = 60
+
+class _DirtyPaths(FileSystemEventHandler):
+    # Collects paths named by file system events until the next poll
+    def __init__(self):
+        self.paths = set()
+        self.lock = threading.Lock()
+
+    def on_any_event(self, event):
+        with self.lock:
+            self.paths.add(event.src_path)
+            if getattr(event, 'dest_path', None):
+                self.paths.add(event.dest_path)
+
+    def take(self):
+        with self.lock:
+            paths, self.paths = self.paths, set()
+        return paths
+
+class Watcher:
+    """
+    Keeps the last crawl of two directory trees in memory and re-audits only what
+    changed. Each poll finds changed files by stat signature (size, mtime, ctime,
+    inode), or from file system events when watchdog is installed, rehashes just
+    those files and returns the issues introduced and resolved since the last poll.
+    """
+
+    def __init__(self, source_crawler, target_crawler, use_events=True):
+        self.crawlers = (source_crawler, target_crawler)
+        self.signatures = ({}, {}) # rel_path -> stat signature, per side
+        self.issues = {} # path -> issues currently reported for it
+        self.report = None
+        self._events = None
+        self._observer = None
+        self._last_full_scan = 0.0
+        self.use_events = use_events and Observer is not None
+
+    def start(self):
+        """Initial crawl and full audit; returns the report."""
+        for crawler, signatures in zip(self.crawlers, self.signatures):
+            # Signatures are taken before hashing: a file that changes in between
+            # is hashed in its new state and simply rehashed on the next poll
+            signatures.update(self._scan(crawler, crawler.base_uri, ''))
+            crawler.crawl()
+            crawler.tree = None # Not maintained across polls
+        self._last_full_scan = time.monotonic()
+
+        source, target = (crawler.assets for crawler in self.crawlers)
+        self.report = Analyzer(source, target, detect_renames=False).analyze()
+        for issue in self.report['details']:
+            self.issues.setdefault(issue['path'], []).append(issue)
+
+        if self.use_events:
+            self._events = _DirtyPaths()
+            self._observer = Observer()
+            for crawler in self.crawlers:
+                self._observer.schedule(self._events, crawler.base_uri, recursive=True)
+            self._observer.start()
+        return self.report
+
+    def poll(self):
+        """Rescan, rehash changed files and re-analyze their paths. Returns a delta report."""
+        changed = set()
+        full = not self.use_events or time.monotonic() - self._last_full_scan >= FULL_SCAN_SECONDS
+        dirty = self._events.take() if self._events else set()
+        for crawler, signatures in zip(self.crawlers, self.signatures):
+            if full:
+                changed |= self._refresh(crawler, signatures, crawler.base_uri, '')
+            else:
+                for full_path in dirty:
+                    rel_path = self._rel_path(crawler, full_path)
+                    if rel_path is not None:
+                        changed |= self._refresh_path(crawler, signatures, full_path, rel_path)
+        if full:
+            self._last_full_scan = time.monotonic()
+        return self._reanalyze(changed)
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+
+    def _scan(self, crawler, directory, prefix):
+        # Stat signatures of every file below directory (ignore rules apply)
+        signatures = {}
+        for full_path, rel_path in crawler._walk(directory, prefix):
+            try:
+                st = os.stat(full_path)
+            except OSError as e:
+                logger.debug(f"Skipping {full_path}, removed during the scan: {e}")
+                continue
+            signatures[rel_path] = (full_path, st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+        return signatures
+
+    def _refresh(self, crawler, signatures, directory, prefix):
+        # Rescan one directory (prefix is its rel path + '/'); rebuild changed assets
+        # and drop removed ones. Returns the rel paths that changed.
+        current = self._scan(crawler, directory, prefix)
+        previous = {path for path in signatures if path.startswith(prefix)}
+        changed = set()
+        for rel_path in previous - set(current):
+            del signatures[rel_path]
+            crawler.assets.pop(rel_path, None)
+            changed.add(rel_path)
+        for rel_path, signature in current.items():
+            if signatures.get(rel_path) != signature:
+                signatures[rel_path] = signature
+                _, crawler.assets[rel_path] = crawler._build_asset((signature[0], rel_path))
+                changed.add(rel_path)
+        return changed
+
+    def _refresh_path(self, crawler, signatures, full_path, rel_path):
+        # One path named by a file system event
+        is_dir = os.path.isdir(full_path)
+        if crawler.ignore and crawler.ignore.excluded_by(rel_path, is_dir):
+            return set()
+        if is_dir:
+            return self._refresh(crawler, signatures, full_path, rel_path + '/')
+        if not os.path.exists(full_path):
+            # A removed file, or everything below a removed directory
+            gone = {path for path in signatures if path == rel_path or path.startswith(rel_path + '/')}
+            for path in gone:
+                del signatures[path]
+                crawler.assets.pop(path, None)
+            return gone
+        try:
+            st = os.stat(full_path)
+        except OSError as e:
+            # Removed again since the event; the next event or full scan catches up
+            logger.debug(f"Skipping event for {full_path}: {e}")
+            return set()
+        signature = (full_path, st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+        if signatures.get(rel_path) == signature:
+            return set()
+        signatures[rel_path] = signature
+        _, crawler.assets[rel_path] = crawler._build_asset((full_path, rel_path))
+        return {rel_path}
+
+    def _rel_path(self, crawler, full_path):
+        rel_path = os.path.relpath(full_path, crawler.base_uri).replace('\\', '/')
+        if rel_path == '.' or rel_path.startswith('../'):
+            return None
+        return rel_path
+
+    def _reanalyze(self, changed):
+        source, target = (crawler.assets for crawler in self.crawlers)
+        analyzer = Analyzer(source, target, detect_renames=False)
+        for path in sorted(changed):
+            if path in source or path in target: # Otherwise removed from both sides
+                analyzer._compare_path(path, source.get(path), target.get(path))
+        current = {}
+        for issue in analyzer.report['details']:
+            current.setdefault(issue['path'], []).append(issue)
+
+        introduced, resolved = [], []
+        for path in sorted(changed):
+            before = self.issues.pop(path, [])
+            after = current.get(path, [])
+            if after:
+                self.issues[path] = after
+            keys_before = {(issue['type'], str(issue['details'])) for issue in before}
+            keys_after = {(issue['type'], str(issue['details'])) for issue in after}
+            introduced.extend(issue for issue in after if (issue['type'], str(issue['details'])) not in keys_before)
+            resolved.extend(issue for issue in before if (issue['type'], str(issue['details'])) not in keys_after)
+
+        self.report = self._current_report()
+        return {'timestamp': time.time(), 'changed_paths': sorted(changed), 'introduced': introduced, 'resolved': resolved}
+
+    def _current_report(self):
+        # Full report rebuilt from the per-path issues, in the layout Analyzer produces
+        report = {
+            'summary': {'missing': 0, 'new': 0, 'modified': 0, 'metadata_mismatch': 0, 'errors': 0, 'renamed': 0, 'cosmetic': 0},
+            'details': [],
+            'removed_in_prod': [],
+            'modified': []
+        }
+        keys = {'MISSING': 'missing', 'NEW': 'new', 'MODIFIED': 'modified', 'METADATA_MISMATCH': 'metadata_mismatch',
+                'ERROR': 'errors', 'COSMETIC': 'cosmetic'}
+        for path in sorted(self.issues):
+            for issue in self.issues[path]:
+                report['details'].append(issue)
+                report['summary'][keys[issue['type']]] += 1
+                if issue['type'] == 'MISSING':
+                    report['removed_in_prod'].append(path)
+                elif issue['type'] == 'MODIFIED':
+                    report['modified'].append(path)
+        return report
@@ -0,0 +1,69 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src import crawler as crawler_module
+from src.crawler import Crawler
+
+def build_tree(root, dirs=20, files_per_dir=100, file_size=16 * 1024):
+    for d in range(dirs):
+        sub = os.path.join(root, f"dir_{d:03d}")
+        os.makedirs(sub)
+        for i in range(files_per_dir):
+            ext = '.py' if i % 10 == 0 else '.bin'
+            with open(os.path.join(sub, f"file_{i:04d}{ext}"), 'wb') as f:
+                if ext == '.py':
+                    f.write(b"import os\nfrom collections import deque\n")
+                f.write(os.urandom(file_size))
+
+def timed_crawl(root, workers):
+    start = time.perf_counter()
+    assets = Crawler(root, workers=workers).crawl()
+    return time.perf_counter() - start, assets
+
+def run_benchmark(worker_counts=(1, 4, 8, 16)):
+    root = tempfile.mkdtemp(prefix='twin_bench_')
+    try:
+        build_tree(root)
+        print(f"Benchmark tree: {root}")
+
+        baseline_time, baseline = timed_crawl(root, 1)
+        print(f"workers=1   {baseline_time:.2f}s  ({len(baseline)} assets)")
+
+        for workers in worker_counts[1:]:
+            elapsed, assets = timed_crawl(root, workers)
+            identical = list(assets) == list(baseline) and all(
+                assets[p].content_hash == baseline[p].content_hash and
+                assets[p].metadata == baseline[p].metadata
+                for p in baseline
+            )
+            print(f"workers={workers:<3d} {elapsed:.2f}s  speedup x{baseline_time / elapsed:.2f}  "
+                  f"{'identical' if identical else 'MISMATCH'}")
+    finally:
+        shutil.rmtree(root)
+
+def simulate_latency(latency_ms):
+    # Emulate a network filesystem (NFS/SMB) where each file open costs a round trip
+    hash_file = crawler_module.hash_file
+
+    def slow_hash_file(full_path, keep_content=False):
+        time.sleep(latency_ms / 1000.0)
+        return hash_file(full_path, keep_content)
+
+    crawler_module.hash_file = slow_hash_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial vs parallel directory crawl benchmark")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated per-file I/O latency")
+    args = parser.parse_args()
+
+    if args.latency_ms:
+        simulate_latency(args.latency_ms)
+    run_benchmark()
@@ -0,0 +1,123 @@
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.crawler import Crawler
+from src.dependencies import DependencyExtractor, js_imports, LANGUAGES
+
+# What _crawl_dir ran over .js/.ts files before the import lexer
+LEGACY_REQUIRE = re.compile(r'require\([\'"]([^\'"]+)[\'"]\)')
+LEGACY_IMPORT = re.compile(r'import\s+.*\s+from\s+[\'"]([^\'"]+)[\'"]')
+
+# (weight, block): mostly plain code, with imports, comments, strings, templates
+# and regex literals at about the density of real sources
+BLOCKS = [
+    (1, "import {{ helper{i}, other as o{i} }} from './lib/helper{i}.js';\n"),
+    (1, "const mod{i} = require('pkg-{i}');\n"),
+    (1, "/**\n * Formats item {i}.\n * @param {{string}} value - import this from 'nowhere'\n */\n"),
+    (1, "export function format{i}(value) {{\n  if (!/^[a-z'\"]+$/i.test(value)) {{ return `item ${{value}} / {i}`; }}\n"
+        "  return value.replace(/\\s+/g, ' ') + total / {i};\n}}\n"),
+    (1, "// require('commented-out-{i}')\nconst label{i} = \"import x from 'in-a-string'\";\n"),
+    (1, "async function load{i}() {{ const m = await import('./lazy{i}.js'); return m.default; }}\n"),
+    (1, "if (ready) {{ run({i}); }} /x'y/.test(label{i});\n"),
+    (12, "  for (let index = 0; index < items.length; index++) {{\n    const item = items[index];\n"
+         "    if (item.enabled && item.count > {i}) {{\n      result.push(transform(item, options.mode));\n"
+         "    }} else {{\n      skipped += item.count * 2;\n    }}\n  }}\n"),
+    (12, "class Widget{i} extends Base {{\n  constructor(props) {{\n    super(props);\n"
+         "    this.state = {{ open: false, size: props.size || {i}, title: props.title }};\n  }}\n"
+         "  toggle() {{ this.setState({{ open: !this.state.open }}); }}\n}}\n"),
+    (6, "const config{i} = {{ name: 'cfg-{i}', retries: 3, timeout: {i} * 1000, enabled: true }};\n"),
+]
+
+def synthetic_source(size, seed=1):
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in BLOCKS]
+    parts, total, i = [], 0, 0
+    while total < size:
+        part = rng.choices(BLOCKS, weights)[0][1].format(i=i)
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return ''.join(parts)
+
+def load_sources(directory):
+    # Every JS/TS file under directory, decoded like extract_dependencies does
+    texts = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if LANGUAGES.get(os.path.splitext(name)[1].lower()) == 'js':
+                with open(os.path.join(root, name), 'rb') as f:
+                    texts.append(f.read().decode('utf-8', errors='replace'))
+    return texts
+
+def legacy_imports(text):
+    return LEGACY_REQUIRE.findall(text) + LEGACY_IMPORT.findall(text)
+
+def best(func, texts, rounds):
+    elapsed = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+def run_lexer_benchmark(texts, rounds):
+    size = sum(len(text) for text in texts)
+    print(f"{len(texts)} files, {size / 2**20:.2f} MB")
+    lexer = best(js_imports, texts, rounds)
+    legacy = best(legacy_imports, texts, rounds)
+    differ = sum(1 for text in texts if set(js_imports(text)) != set(legacy_imports(text)))
+    print(f"  import lexer:    {lexer * 1000:8.1f} ms  ({size / 2**20 / lexer:.0f} MB/s)")
+    print(f"  legacy regexes:  {legacy * 1000:8.1f} ms  ({size / 2**20 / legacy:.0f} MB/s)")
+    print(f"  files where the two disagree: {differ}")
+
+def run_crawl_benchmark(texts, dep_workers):
+    # Crawl of the same sources with parsing in-process, then in batches to a process pool
+    root = tempfile.mkdtemp(prefix='twin_deps_')
+    try:
+        for i, text in enumerate(texts):
+            sub = os.path.join(root, f"dir_{i // 100:03d}")
+            os.makedirs(sub, exist_ok=True)
+            with open(os.path.join(sub, f"file_{i:05d}.js"), 'w', encoding='utf-8') as f:
+                f.write(text)
+
+        results = {}
+        for workers in (None, dep_workers):
+            extractor = DependencyExtractor(workers=workers)
+            start = time.perf_counter()
+            assets = Crawler(root, extractor=extractor).crawl()
+            elapsed = time.perf_counter() - start
+            extractor.close()
+            results[workers] = {path: asset.metadata.get('dependencies') for path, asset in assets.items()}
+            print(f"  crawl, dep-workers={workers or 1:<3d} {elapsed:.2f}s  ({len(assets)} files)")
+        print(f"  {'identical' if results[None] == results[dep_workers] else 'MISMATCH'} dependencies")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JS/TS import lexer vs the regexes it replaced, and batched parsing in a process pool")
+    parser.add_argument('--path', help="Benchmark the JS/TS files under this directory instead of synthetic sources")
+    parser.add_argument('--size-mb', type=float, default=2.0, help="Synthetic sources: total size")
+    parser.add_argument('--files', type=int, default=200, help="Synthetic sources: number of files")
+    parser.add_argument('--rounds', type=int, default=5, help="Best of N rounds")
+    parser.add_argument('--dep-workers', type=int, default=4, help="Processes for the pooled crawl (0 to skip the crawl)")
+    args = parser.parse_args()
+
+    if args.path:
+        texts = load_sources(args.path)
+    else:
+        per_file = int(args.size_mb * 2**20 / args.files)
+        texts = [synthetic_source(per_file, seed=i) for i in range(args.files)]
+    run_lexer_benchmark(texts, args.rounds)
+    if args.dep_workers > 1:
+        run_crawl_benchmark(texts, args.dep_workers)
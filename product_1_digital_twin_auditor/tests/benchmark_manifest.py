@@ -0,0 +1,73 @@
+import argparse
+import gc
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.crawler import Asset
+from src.manifest import AssetManifest
+from src.analyzer import Analyzer
+
+def synthetic_assets(count):
+    # Shaped like a directory crawl: 1000 files per directory, a few source files with dependencies
+    for i in range(count):
+        path = f"app/module_{i // 1000:05d}/file_{i:08d}.bin"
+        metadata = {'size': 4096 + i % 512, 'permissions': '644', 'mtime': 1700000000.0 + i}
+        if i % 50 == 0:
+            metadata['dependencies'] = ['os', 'sys']
+        digest = hashlib.sha256(i.to_bytes(8, 'little')).hexdigest()
+        yield Asset(path, 'file', metadata=metadata, content_hash=digest)
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, size, elapsed
+
+def build_dict(count):
+    return {asset.path: asset for asset in synthetic_assets(count)}
+
+def build_manifest(count):
+    manifest = AssetManifest()
+    for asset in synthetic_assets(count):
+        manifest[asset.path] = asset
+    return manifest
+
+def run_benchmark(sizes):
+    for count in sizes:
+        print(f"\n{count:,} assets")
+
+        assets, dict_bytes, dict_time = measure(lambda: build_dict(count))
+        start = time.perf_counter()
+        Analyzer(assets, assets).analyze()
+        dict_analyze = time.perf_counter() - start
+        del assets
+
+        manifest, manifest_bytes, manifest_time = measure(lambda: build_manifest(count))
+        start = time.perf_counter()
+        Analyzer(manifest, manifest).analyze()
+        manifest_analyze = time.perf_counter() - start
+        del manifest
+
+        print(f"  Asset dict:     {dict_bytes / 2**20:9.1f} MiB  ({dict_bytes / count:6.0f} B/asset)  "
+              f"build {dict_time:6.1f}s  analyze {dict_analyze:6.1f}s")
+        print(f"  AssetManifest:  {manifest_bytes / 2**20:9.1f} MiB  ({manifest_bytes / count:6.0f} B/asset)  "
+              f"build {manifest_time:6.1f}s  analyze {manifest_analyze:6.1f}s")
+        print(f"  Reduction:      x{dict_bytes / manifest_bytes:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory benchmark: Asset dict vs AssetManifest")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000],
+                        help="Asset counts to measure (10M needs several GB for the dict baseline)")
+    args = parser.parse_args()
+    run_benchmark(args.sizes)
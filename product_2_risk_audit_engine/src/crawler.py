@@ -1,10 +1,37 @@
 import requests
 import os
-from urllib.parse import urlparse, urljoin
+import re
+import codecs
+from urllib.parse import urlparse, urljoin, urldefrag
+from .html_extract import extract_page
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Binary/text classification and encoding detection only look at the head of the content
+SNIFF_SIZE = 8192
+
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'), # Before UTF-16 LE, which is a prefix of it
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Signatures of common binary formats (images, archives, executables, media, fonts)
+MAGIC = (b'\x89PNG', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'%PDF-', b'PK\x03\x04', b'\x1f\x8b', b'BZh',
+         b'\xfd7zXZ\x00', b'7z\xbc\xaf\x27\x1c', b'\x7fELF', b'\xca\xfe\xba\xbe', b'RIFF', b'OggS', b'ID3',
+         b'wOFF', b'wOF2', b'\x00asm')
+
+CHARSET = re.compile(rb'charset\s*=\s*["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET = re.compile(rb'<meta\s[^>]*?charset\s*=\s*["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+# A UTF-16/32 declaration without a BOM is read as UTF-8, as the HTML spec does:
+# ASCII-compatible bytes cannot be wide text
+WIDE_ENCODINGS = ('utf-16', 'utf-32')
+
 class AuditTarget:
     def __init__(self, url=None, path=None):
         self.url = url
@@ -13,10 +40,81 @@ class AuditTarget:
         self.content = None
         self.headers = {}
         self.status_code = None
+        self.size = None # Bytes of content, known for a local file before it is read
+        self.error = None # Why the asset could not be fetched or read
+        self.rule_matches = None # Filled by scanners.rules.rule_matches
+        self._encoding = None
+        self._is_binary = None
+        self._text = None
+        self._page = None
+
+    @property
+    def encoding(self):
+        """Byte order mark, then the HTTP Content-Type charset, then <meta charset> in HTML, else utf-8."""
+        if self._encoding is None:
+            self._encoding = self._detect_encoding()
+        return self._encoding
+
+    @property
+    def is_binary(self):
+        """True for content with a binary format signature, or a null byte in its head (UTF-16/32 excepted)."""
+        if self._is_binary is None:
+            head = (self.content or b'')[:SNIFF_SIZE]
+            if any(head.startswith(bom) for bom, _ in BOMS):
+                self._is_binary = False
+            else:
+                self._is_binary = head.startswith(MAGIC) or head[4:8] == b'ftyp' or b'\x00' in head
+        return self._is_binary
+
+    @property
+    def text(self):
+        """Content decoded once and shared by every scanner ('' for binary or empty content)."""
+        if self._text is None:
+            if not self.content or self.is_binary:
+                self._text = ''
+            else:
+                self._text = self.content.decode(self.encoding, errors='ignore')
+        return self._text
+
+    @property
+    def is_html(self):
+        """Served as text/html, or a local .html/.htm file."""
+        if self.is_remote:
+            return 'text/html' in self.headers.get('Content-Type', '')
+        return bool(self.path) and self.path.endswith(('.html', '.htm'))
+
+    @property
+    def page(self):
+        """PageInfo (links, title, meta tags, headings, images) parsed once, or None for non-HTML assets."""
+        if self._page is None and self.is_html and self.text:
+            self._page = extract_page(self.text)
+        return self._page
+
+    def _detect_encoding(self):
+        head = (self.content or b'')[:SNIFF_SIZE]
+        for bom, encoding in BOMS:
+            if head.startswith(bom):
+                return encoding
+        declared = []
+        if self.is_remote:
+            declared.append(CHARSET.search(self.headers.get('Content-Type', '').encode('latin-1', errors='ignore')))
+        if self.is_html:
+            # Only markup declares its own charset; a source file that merely
+            # mentions 'charset=' in a string does not
+            declared.append(META_CHARSET.search(head[:1024]))
+        for match in declared:
+            if match:
+                try:
+                    encoding = codecs.lookup(match.group(1).decode('ascii')).name
+                except LookupError:
+                    continue # Unknown charset name
+                return 'utf-8' if encoding.startswith(WIDE_ENCODINGS) else encoding
+        return 'utf-8'
 
 class Crawler:
-    def __init__(self, target):
+    def __init__(self, target, read_files=True):
         self.target = target # String url or path
+        self.read_files = read_files # False: list local files with their size, for the caller to read
         self.visited = {} # Map url/path -> AuditTarget
 
     def crawl(self, limit=50):
@@ -42,20 +140,17 @@ class Crawler:
                 response = requests.get(url, timeout=5)
                 target = AuditTarget(url=url)
                 target.content = response.content
+                target.size = len(response.content)
                 target.headers = response.headers
                 target.status_code = response.status_code
                 
                 self.visited[url] = target
 
-                # Simple link extraction for next hop
-                if 'text/html' in response.headers.get('Content-Type', ''):
-                    # We'll rely on Scanners to parse HTML deeply, 
-                    # but here we just need links for the crawler.
-                    # Using simple string search for speed in MVP
-                    import re
-                    links = re.findall(r'href=[\'"]?([^\'" >]+)', response.text)
-                    for link in links:
-                        next_url = urljoin(url, link)
+                # Links for the next hop; the parsed page stays on the target for the scanners
+                if target.page:
+                    base = urljoin(url, target.page.base) if target.page.base else url
+                    for link in target.page.links:
+                        next_url = urldefrag(urljoin(base, link))[0] # '#section' is the same page
                         if urlparse(next_url).netloc == base_domain:
                             if next_url not in self.visited and next_url not in queue:
                                 queue.append(next_url)
@@ -70,12 +165,15 @@ class Crawler:
         for root, _, files in os.walk(root_path):
             for file in files:
                 full_path = os.path.join(root, file)
+                target = AuditTarget(path=full_path)
+                self.visited[full_path] = target
                 try:
-                    with open(full_path, 'rb') as f:
-                        content = f.read()
-                    
-                    target = AuditTarget(path=full_path)
-                    target.content = content
-                    self.visited[full_path] = target
-                except Exception as e:
+                    if self.read_files:
+                        with open(full_path, 'rb') as f:
+                            target.content = f.read()
+                        target.size = len(target.content)
+                    else:
+                        target.size = os.path.getsize(full_path)
+                except OSError as e:
                     logger.error(f"Failed to read {full_path}: {e}")
+                    target.error = str(e)
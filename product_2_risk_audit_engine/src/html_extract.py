@@ -0,0 +1,204 @@
+import re
+import string
+from functools import cached_property
+from html import unescape
+
+HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# A quoted attribute value, or a '<' that does not open a tag. Quoted values may
+# hold '>', but nothing runs past a '<' that opens another tag, so an unclosed
+# '<a' fails at the next tag instead of scanning the rest of the page (a page of
+# them was quadratic).
+_VALUE = r'''"[^<"]*(?:<(?![a-z/!?])[^<"]*)*"|'[^<']*(?:<(?![a-z/!?])[^<']*)*'|<(?![a-z/!?])'''
+# Attribute source of a start tag
+_ATTRS = r'''[^<>"']*(?:(?:''' + _VALUE + r''')[^<>"']*)*'''
+# The same, capturing 'alt' when an attribute has that name
+_IMG_ATTRS = r'''[^<>"'a]*(?:(?:''' + _VALUE + r'''|(?<![^\s/"'])(alt)(?![^\s=/>])|a)[^<>"'a]*)*'''
+
+# Text that is not markup: comments, the bodies of <script> and <style>, and the
+# text of <title>. They are blanked out of the copy the tag patterns run over,
+# so a '<a href>' in a JS string or a commented-out <h1> is not page content.
+RAW = re.compile(r'<(?:!--|script|style|title)')
+START_END = re.compile(_ATTRS + '>')
+RAW_END = {name: re.compile(rf'</{name}\s*>') for name in ('script', 'style', 'title')}
+
+# One pattern per field, each opening with a literal: the regex engine skips to
+# it with a substring search instead of trying every '<'. They run over the
+# blanked, ASCII-lowercased copy, which has the page's offsets; values are read
+# from the original text.
+META = re.compile(r'<meta\b(' + _ATTRS + ')>')
+IMG = re.compile(r'<img\b(' + _ATTRS + ')>')
+IMG_ALT = re.compile(r'<img\b' + _IMG_ATTRS + '>')
+HEADING = re.compile(r'<h([1-6])\b' + _ATTRS + '>')
+# A heading ends at its own end tag, or where the next heading starts
+HEADING_END = {level: re.compile(rf'</h{level}\s*>|<h[1-6]\b') for level in '123456'}
+# Links are found by their href, then checked to be an attribute of an <a>,
+# <area>, <link> or <base> start tag
+HREF = re.compile(r'''href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))''')
+LINK = re.compile(r'<(a|area|link|base)\b(' + _ATTRS + ')>')
+
+# name="value", name='value', name=value or a bare name
+ATTR = re.compile(r'''([^\s"'>/=]+)(?:\s*(=)\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+
+# A tag inside heading text; a stray '<' ("a < b") is text, not the start of one
+MARKUP = re.compile(r'<[^<>]*>')
+
+SPACE = ' \t\n\r\f'
+TAG_OPEN = string.ascii_lowercase + '/!?'
+LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+class PageInfo:
+    """
+    What the crawler and the HTML-aware scanners need from a page. The page is
+    prepared once; each part is read from it when first asked for, so a consumer
+    pays only for the parts it uses.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        # ASCII-lowercased copy with the raw text blanked; the first title's span
+        self._markup, self._title_span = _blank_raw(text)
+
+    @cached_property
+    def title(self):
+        """Text of the first <title>, None if the page has none. Taken as is: browsers do not parse markup inside it."""
+        if self._title_span is None:
+            return None
+        return ' '.join(_unescape(self.text[slice(*self._title_span)]).split())
+
+    @property
+    def links(self):
+        """href values in document order (any tag but <base>)."""
+        return self._link_tags[0]
+
+    @property
+    def base(self):
+        """First <base href>, for resolving links."""
+        return self._link_tags[1]
+
+    @cached_property
+    def _link_tags(self):
+        links, base = [], None
+        markup = self._markup
+        read = last = opened = -1
+        for href in HREF.finditer(markup):
+            start = href.start()
+            if markup[start - 1] not in SPACE + '"\'/': # 'data-href'
+                continue
+            # The tag it is in; a '<' that opens no tag can sit in a quoted value.
+            # Back to the previous href at most: from there it is that one's tag.
+            open_at = markup.rfind('<', last + 1, start)
+            while open_at != -1 and markup[open_at + 1:open_at + 2] not in TAG_OPEN:
+                open_at = markup.rfind('<', last + 1, open_at)
+            last = start
+            if open_at != -1:
+                opened = open_at
+            if opened == read: # Each tag is read once, for its first href
+                continue
+            read = opened
+            tag = LINK.match(markup, opened)
+            if not tag or tag.end() <= start:
+                continue
+            if '"' in markup[tag.start(2):start] or "'" in markup[tag.start(2):start]:
+                # Quoted values come first: this href may be inside one of them
+                href = _attr(markup, tag.start(2), tag.end(2), 'href')
+                if not href:
+                    continue
+            value = _unescape(self.text[href.start(href.lastindex):href.end(href.lastindex)]).strip()
+            if tag.group(1) != 'base':
+                links.append(value)
+            elif base is None:
+                base = value
+        return links, base
+
+    @cached_property
+    def meta(self):
+        """Lowercased name/property/http-equiv -> content (first wins)."""
+        meta = {}
+        for match in META.finditer(self._markup):
+            attrs = parse_attrs(self.text[match.start(1):match.end(1)])
+            key = attrs.get('name') or attrs.get('property') or attrs.get('http-equiv')
+            if key and attrs.get('content') is not None:
+                meta.setdefault(key.lower(), attrs['content'])
+        return meta
+
+    @cached_property
+    def headings(self):
+        """Text of each heading by level, in order."""
+        headings = {level: [] for level in HEADINGS}
+        for match in HEADING.finditer(self._markup):
+            level = match.group(1)
+            end = HEADING_END[level].search(self._markup, match.end())
+            stop = end.start() if end else len(self.text)
+            headings['h' + level].append(_text(self.text[match.end():stop]))
+        return headings
+
+    @cached_property
+    def images(self):
+        """Attribute dict of each <img>."""
+        return [parse_attrs(self.text[match.start(1):match.end(1)]) for match in IMG.finditer(self._markup)]
+
+    @cached_property
+    def missing_alt(self):
+        """How many <img> have no alt attribute (alt="" counts as present), without building attribute dicts."""
+        return IMG_ALT.findall(self._markup).count('')
+
+def parse_attrs(source):
+    """Attribute dict with lowercased names and decoded values; a bare name maps to None."""
+    attrs = {}
+    for name, equals, double, single, bare in ATTR.findall(source):
+        # findall gives '' for the two value forms not used, and for all three without '='
+        attrs.setdefault(name.lower(), _unescape(double + single + bare) if equals else None)
+    return attrs
+
+def extract_page(text):
+    """PageInfo of an HTML document."""
+    return PageInfo(text)
+
+def _blank_raw(text):
+    # Lowercases the page and blanks its raw text with spaces, keeping offsets.
+    # Returns the copy and the (start, end) of the first title's text, or None.
+    lowered = text.lower() if text.isascii() else text.translate(LOWER)
+    match = RAW.search(lowered)
+    if not match:
+        return lowered, None
+    pieces = []
+    title = None
+    pos = 0
+    while match:
+        start = match.start()
+        if lowered[start + 1] == '!': # Comment
+            end = lowered.find('-->', start + 4)
+            end = len(lowered) if end == -1 else end + 3
+        else:
+            name = lowered[start + 1:match.end()]
+            start_tag = START_END.match(lowered, match.end())
+            # '<scripts' is another tag; an unclosed start tag is not an element
+            if lowered[match.end():match.end() + 1] not in SPACE + '/>' or not start_tag:
+                match = RAW.search(lowered, match.end())
+                continue
+            close = RAW_END[name].search(lowered, start_tag.end())
+            if name == 'title' and title is None:
+                title = (start_tag.end(), close.start() if close else len(lowered))
+            end = close.end() if close else len(lowered)
+        pieces.append(lowered[pos:start])
+        pieces.append(' ' * (end - start))
+        pos = end
+        match = RAW.search(lowered, pos)
+    pieces.append(lowered[pos:])
+    return ''.join(pieces), title
+
+def _attr(source, start, end, name):
+    # Match of the first attribute called name in source[start:end], or None;
+    # its value is in the last group used
+    for match in ATTR.finditer(source, start, end):
+        if match.group(1) == name:
+            return match if match.group(2) else None
+    return None
+
+def _unescape(value):
+    return unescape(value) if '&' in value else value
+
+def _text(markup):
+    # Visible text of a fragment: tags dropped, references decoded, whitespace collapsed
+    return ' '.join(_unescape(MARKUP.sub('', markup)).split())
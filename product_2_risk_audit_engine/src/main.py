@@ -12,10 +12,11 @@ def main():
     parser = argparse.ArgumentParser(description="Launch Risk Intelligence - Automated Risk Audit Engine")
     parser.add_argument('--target', required=True, help="Target URL or Directory Path to audit")
     parser.add_argument('--output', default='risk_report.json', help="Output JSON report file path")
+    parser.add_argument('--workers', type=int, help="Processes to scan assets with (default: scan in-process)")
     
     args = parser.parse_args()
 
-    engine = AuditEngine()
+    engine = AuditEngine(workers=args.workers)
     report = engine.run(args.target)
 
     # Console Summary
@@ -29,6 +29,12 @@ class RiskRegistry:
         })
         self.stats[severity] += 1
 
+    def merge(self, other):
+        # Appends another registry's findings (e.g. from a scan worker) after this one's
+        self.findings.extend(other.findings)
+        for severity, count in other.stats.items():
+            self.stats[severity] += count
+
     def get_report(self):
         return {
             'summary': self.stats,
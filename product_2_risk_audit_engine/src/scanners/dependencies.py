@@ -3,7 +3,7 @@ from .base import BaseScanner
 
 class DependencyScanner(BaseScanner):
     def scan(self, target):
-        if not target.path: return # Only relevant for file system scan usually, unless we find these files via web (rare/bad)
+        if not target.path or target.is_binary: return # Only relevant for file system scan usually, unless we find these files via web (rare/bad)
         
         filename = os.path.basename(target.path)
         
@@ -13,8 +13,7 @@ class DependencyScanner(BaseScanner):
             self._scan_package_json(target)
 
     def _scan_requirements_txt(self, target):
-        content = target.content.decode('utf-8', errors='ignore')
-        lines = content.splitlines()
+        lines = target.text.splitlines()
         
         unpinned = []
         for line in lines:
@@ -31,7 +30,7 @@ class DependencyScanner(BaseScanner):
         # But let's try basic json parse
         import json
         try:
-            data = json.loads(target.content)
+            data = json.loads(target.text)
             deps = data.get('dependencies', {})
             dev_deps = data.get('devDependencies', {})
             
@@ -0,0 +1,87 @@
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.crawler import Crawler
+from src.engine import AuditEngine, PARALLEL_MIN_BYTES, make_scanners, scan_assets, _load_shard, _shard_item
+from src.risk_registry import RiskRegistry
+from benchmark_scanners import synthetic_assets
+
+def write_tree(root, count, size):
+    # The scanner benchmark's synthetic assets, written out as a directory tree
+    for target in synthetic_assets(count, size):
+        path = os.path.join(root, target.path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(target.content)
+
+def findings(registry):
+    return [(f['location'], f['description']) for f in registry.findings]
+
+def run_benchmark(count, size, worker_counts, rounds):
+    with tempfile.TemporaryDirectory() as root:
+        write_tree(root, count, size)
+        assets = Crawler(root).crawl()
+        total_mb = sum(len(a.content) for a in assets.values()) / 2**20
+        print(f"{count:,} files, {total_mb:.1f} MiB, {os.cpu_count()} CPU(s)")
+        print(f"  Pool threshold: {PARALLEL_MIN_BYTES / 2**20:.0f} MiB, so with workers this tree is scanned "
+              f"{'in worker processes' if total_mb * 2**20 >= PARALLEL_MIN_BYTES else 'in-process'}")
+
+        # What the pool pickles to its workers for the whole tree
+        with_content = len(pickle.dumps(list(assets.items())))
+        paths_only = len(pickle.dumps([_shard_item(path, asset) for path, asset in assets.items()]))
+        print(f"  Pickled to workers: {with_content / 2**20:.1f} MiB with content, {paths_only / 2**20:.2f} MiB as paths")
+        del assets
+
+        # Each run lists or reads the tree itself, as AuditEngine.run does
+        def read_then_scan():
+            registry = RiskRegistry()
+            scan_assets(make_scanners(registry), Crawler(root).crawl().items())
+            return registry
+
+        def list_then_scan():
+            registry = RiskRegistry()
+            items = [_shard_item(path, asset) for path, asset in Crawler(root, read_files=False).crawl().items()]
+            scan_assets(make_scanners(registry), _load_shard(items, {}))
+            return registry
+
+        def pool(workers):
+            engine = AuditEngine(workers=workers)
+            engine._scan_parallel(Crawler(root, read_files=False).crawl())
+            return engine.registry
+
+        serial_time = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            registry = read_then_scan()
+            serial_time = min(serial_time, time.perf_counter() - start)
+        expected = findings(registry)
+        print(f"  Read all, then scan: {serial_time:6.2f} s  {total_mb / serial_time:7.1f} MB/s")
+
+        runs = [('Read while scanning', list_then_scan)]
+        runs += [(f"{workers} workers", lambda workers=workers: pool(workers)) for workers in worker_counts]
+        for name, run in runs:
+            elapsed = float('inf')
+            for _ in range(rounds):
+                start = time.perf_counter()
+                registry = run()
+                elapsed = min(elapsed, time.perf_counter() - start)
+            same = findings(registry) == expected
+            print(f"  {name + ':':20s} {elapsed:6.2f} s  {total_mb / elapsed:7.1f} MB/s"
+                  f"  (x{serial_time / elapsed:.2f}, same findings: {same})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan benchmark: in-process vs worker processes over a synthetic tree")
+    parser.add_argument('--files', type=int, default=2000, help="Number of synthetic files")
+    parser.add_argument('--size', type=int, default=32 * 1024, help="Approximate bytes per file")
+    parser.add_argument('--workers', type=int, action='append', help="Worker count to time (repeatable; default: 2 and 4)")
+    parser.add_argument('--rounds', type=int, default=3, help="Best of N rounds")
+    args = parser.parse_args()
+    run_benchmark(args.files, args.size, args.workers or [2, 4], args.rounds)
@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.html_extract import extract_page
+
+# What the crawler and SEOScanner ran per page before the shared extraction
+LEGACY_TITLE = re.compile(r'<title>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+LEGACY_META = re.compile(r'<meta\s+name=["\']description["\']\s+content=["\'](.*?)["\']', re.IGNORECASE)
+LEGACY_H1 = re.compile(r'<h1[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+LEGACY_IMG = re.compile(r'<img[^>]+>', re.IGNORECASE)
+LEGACY_HREF = re.compile(r'href=[\'"]?([^\'" >]+)')
+
+BLOCKS = [
+    '<div class="card card-{i}"><p>Some text about product {i} with <b>bold</b> words and <span class="x">spans</span>.</p></div>',
+    '<p>Paragraph {i}: lorem ipsum dolor sit amet, consectetur adipiscing elit, <em>sed</em> do eiusmod tempor.</p>',
+    '<a href="/p/{i}" class="link">Product {i}</a>',
+    '<img src="/i/{i}.png" alt="img {i}" width="10" height="10" loading="lazy">',
+    '<ul><li>one</li><li>two</li><li>three &amp; four</li></ul>',
+    '<div><span>{i}</span><span>x</span></div>',
+]
+
+def synthetic_page(blocks, seed=1):
+    # Markup-dense page: a head with meta, script and style, then a body of
+    # links, images and short text
+    rng = random.Random(seed)
+    parts = ['<!doctype html><html lang="en"><head><meta charset="utf-8"><title>Shop &amp; More | Example</title>',
+             '<meta name="description" content="A page"><meta property="og:title" content="Shop">',
+             '<link rel="stylesheet" href="/a.css"><link rel="icon" href="/favicon.ico">',
+             '<script>window.dataLayer = []; if (a < b) { x = "<a href=x>"; }</script>',
+             '<style>.a{color:red} .b > .c {margin:0}</style></head><body><main><h1>Welcome to the shop</h1>']
+    for i in range(blocks):
+        parts.append(rng.choice(BLOCKS).format(i=i))
+        if i % 60 == 0:
+            parts.append(f'<h2>Heading {i}</h2>')
+    parts.append('<!-- footer --><footer><p>&copy; Example</p></footer></main></body></html>')
+    return '\n'.join(parts)
+
+def legacy_seo(text):
+    return (LEGACY_TITLE.search(text), LEGACY_META.search(text), LEGACY_H1.findall(text),
+            [tag for tag in LEGACY_IMG.findall(text) if 'alt=' not in tag])
+
+def seo(text):
+    # The fields SEOScanner reads
+    page = extract_page(text)
+    return page.title, page.meta, page.headings, page.missing_alt
+
+def crawl_and_seo(text):
+    # A fetched page: SEO fields plus the links the crawler follows
+    page = extract_page(text)
+    return page.title, page.meta, page.headings, page.missing_alt, page.links, page.base
+
+def best(func, text, rounds):
+    elapsed = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(text)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed * 1000
+
+def run_benchmark(block_counts, rounds):
+    for blocks in block_counts:
+        text = synthetic_page(blocks)
+        print(f"{len(text) / 1024:.0f} KB page, {text.count('<'):,} '<'")
+        legacy = best(legacy_seo, text, rounds)
+        legacy_all = best(lambda t: (legacy_seo(t), LEGACY_HREF.findall(t)), text, rounds)
+        print(f"  SEO fields:          {best(seo, text, rounds):6.3f} ms  (legacy regexes {legacy:.3f} ms)")
+        print(f"  SEO fields + links:  {best(crawl_and_seo, text, rounds):6.3f} ms  (legacy regexes {legacy_all:.3f} ms)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-page cost: shared HTML extraction vs the regexes it replaced")
+    parser.add_argument('--blocks', type=int, action='append', help="Body blocks per page (repeatable; default: 100, 400 and 1500)")
+    parser.add_argument('--rounds', type=int, default=300, help="Best of N rounds")
+    args = parser.parse_args()
+    run_benchmark(args.blocks or [100, 400, 1500], args.rounds)
@@ -54,7 +54,7 @@ if st.button("🚀 Run Configuration Audit"):
             # delta = analyzer.compare(src_dict, tgt_dict)
             
             # CORRECT FIX: Analyzer takes (source_assets, target_assets) in constructor and has analyze() method
-            analyzer = Analyzer(source_data, target_data)
+            analyzer = Analyzer(source_data, target_data, crawler.tree, crawler_target.tree)
             delta = analyzer.analyze()
             
             st.success("Audit Complete!")